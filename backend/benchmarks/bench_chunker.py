@@ -0,0 +1,44 @@
+"""Benchmark chunking throughput: character chunker vs token-based chunker.
+
+Usage (from backend/):
+    python -m benchmarks.bench_chunker --pages 2000
+"""
+import argparse
+import time
+
+from utils.chunker import chunk_scraped_data, iter_token_chunks, approx_token_counts, get_token_counter
+from webscrape.extractors import extract_page
+from .fixtures import load_fixtures
+
+
+def run(name, fn, pages, count_tokens):
+    start = time.perf_counter()
+    chunks = list(fn(pages))
+    elapsed = time.perf_counter() - start
+    tokens = count_tokens([c['text'] for c in chunks[:2000]])
+    print(f"  {name:<28} {len(pages) / elapsed:9.1f} pages/sec  {len(chunks):7d} chunks  "
+          f"avg {sum(tokens) / max(len(tokens), 1):6.1f} tokens  max {max(tokens, default=0)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--max-tokens", type=int, default=250)
+    parser.add_argument("--overlap", type=int, default=32)
+    args = parser.parse_args()
+
+    pages = [extract_page(url, html)[0] for url, html in load_fixtures(args.pages)]
+    tokenizer = get_token_counter()
+    print(f"Chunking {len(pages)} pages")
+
+    run("chunk_scraped_data (chars)", lambda p: chunk_scraped_data(p, args.chunk_size), pages, tokenizer)
+    run("iter_token_chunks (approx)",
+        lambda p: iter_token_chunks(p, args.max_tokens, args.overlap, approx_token_counts), pages, tokenizer)
+    if tokenizer is not approx_token_counts:
+        run("iter_token_chunks (tokenizer)",
+            lambda p: iter_token_chunks(p, args.max_tokens, args.overlap, tokenizer), pages, tokenizer)
+
+
+if __name__ == "__main__":
+    main()
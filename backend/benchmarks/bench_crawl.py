@@ -0,0 +1,166 @@
+"""Benchmark crawl seeding and connection pooling against a local stand-in site.
+
+Serves a --pages page site from 127.0.0.1 with --latency-ms of simulated
+server latency per request. Pages link to each other as a tree with
+--branching children each, so link-only discovery has to walk the tree
+level by level (--branching 1 is a paginated listing, discoverable one
+page at a time); a gzipped sitemap index lists every page with a lastmod.
+
+Each scenario runs webscrape.scraper.main and reports wall time, pages
+crawled, requests the server saw and bytes it sent:
+
+    links      link discovery only, per --pool size
+    sitemap    frontier seeded from the sitemap, per --pool size
+    recrawl    sitemap crawl repeated with the crawl cache warm, so pages
+               whose lastmod predates the last fetch are not requested
+
+HTTP/2 needs TLS (httpx does not speak h2c), so the local server is
+HTTP/1.1 only and these numbers show keep-alive pooling, not multiplexing.
+
+Usage (from backend/):
+    python -m benchmarks.bench_crawl --pages 500 --latency-ms 20 --pool 4 10 32
+"""
+import argparse
+import asyncio
+import contextlib
+import gzip
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+from aiohttp import web
+
+from webscrape import scraper
+from .fixtures import _WORDS
+
+LASTMOD = "2024-01-01T00:00:00+00:00"
+SITEMAP_SIZE = 200
+
+
+class StandInSite:
+    """aiohttp app serving a linked page tree plus robots.txt and sitemaps; counts traffic."""
+
+    def __init__(self, pages, branching, latency):
+        self.pages = pages
+        self.branching = branching
+        self.latency = latency
+        self.requests = 0
+        self.bytes_sent = 0
+        self.base = None
+
+    def page_url(self, n):
+        return f"{self.base}/" if n == 0 else f"{self.base}/page-{n}/"
+
+    def page_html(self, n):
+        rng = random.Random(n)
+        text = "".join(
+            "<p>" + " ".join(rng.choice(_WORDS) for _ in range(rng.randint(40, 120))).capitalize() + ".</p>"
+            for _ in range(8)
+        )
+        children = [n * self.branching + k for k in range(1, self.branching + 1)]
+        links = "".join(f'<a href="{self.page_url(c)}">Page {c}</a>' for c in children if c < self.pages)
+        return (f"<html><head><title>Page {n} | University of Stirling</title></head>"
+                f"<body><main><h1>Page {n}</h1>{text}{links}</main></body></html>")
+
+    def sitemap_index(self):
+        maps = "".join(
+            f"<sitemap><loc>{self.base}/sitemap-{i}.xml.gz</loc><lastmod>{LASTMOD}</lastmod></sitemap>"
+            for i in range((self.pages + SITEMAP_SIZE - 1) // SITEMAP_SIZE)
+        )
+        return f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{maps}</sitemapindex>'
+
+    def sitemap(self, i):
+        urls = "".join(
+            f"<url><loc>{self.page_url(n)}</loc><lastmod>{LASTMOD}</lastmod></url>"
+            for n in range(i * SITEMAP_SIZE, min(self.pages, (i + 1) * SITEMAP_SIZE))
+        )
+        xml = f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+        return gzip.compress(xml.encode())
+
+    async def handle(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        path = request.path
+        if path == "/robots.txt":
+            body, content_type = f"User-agent: *\nAllow: /\nSitemap: {self.base}/sitemap.xml\n", "text/plain"
+        elif path == "/sitemap.xml":
+            body, content_type = self.sitemap_index(), "application/xml"
+        elif path.startswith("/sitemap-"):
+            body, content_type = self.sitemap(int(path[len("/sitemap-"):].split(".")[0])), "application/gzip"
+        elif path == "/":
+            body, content_type = self.page_html(0), "text/html"
+        elif path.startswith("/page-") and int(path.strip("/").split("-")[1]) < self.pages:
+            body, content_type = self.page_html(int(path.strip("/").split("-")[1])), "text/html"
+        else:
+            return web.Response(status=404)
+        body = body.encode() if isinstance(body, str) else body
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type=content_type)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self.handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base = f"http://127.0.0.1:{port}"
+        return runner
+
+
+async def crawl(site, workdir, pool, use_sitemap, cache_path=None):
+    site.requests = site.bytes_sent = 0
+    output = os.path.join(workdir, "chunks.jsonl")
+    frontier_path = os.path.join(workdir, "frontier.db")
+    for path in (output, frontier_path):
+        if os.path.exists(path):
+            os.remove(path)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await scraper.main(max_concurrent=pool, cache_path=cache_path, output_path=output,
+                           frontier_path=frontier_path, requests_per_second=10000.0, dedup=False,
+                           use_sitemap=use_sitemap, site=site.base)
+    elapsed = time.perf_counter() - start
+    with open(output) as f:
+        pages = len({json.loads(line)["url"] for line in f})
+    return {"seconds": elapsed, "pages": pages, "requests": site.requests, "bytes": site.bytes_sent}
+
+
+async def run(args):
+    site = StandInSite(args.pages, args.branching, args.latency_ms / 1000)
+    runner = await site.start()
+    workdir = tempfile.mkdtemp(prefix="bench_crawl_")
+    results = []
+    try:
+        for pool in args.pool:
+            results.append((f"links pool={pool}", await crawl(site, workdir, pool, use_sitemap=False)))
+            results.append((f"sitemap pool={pool}", await crawl(site, workdir, pool, use_sitemap=True)))
+        pool = max(args.pool)
+        cache_path = os.path.join(workdir, "crawl_cache.db")
+        results.append(("recrawl cold", await crawl(site, workdir, pool, True, cache_path)))
+        results.append(("recrawl warm", await crawl(site, workdir, pool, True, cache_path)))
+    finally:
+        await runner.cleanup()
+
+    print(f"\n{args.pages} pages, branching {args.branching}, {args.latency_ms:.0f} ms latency")
+    print(f"{'scenario':<20} {'seconds':>8} {'pages':>6} {'requests':>9} {'KB sent':>9} {'pages/s':>8}")
+    for name, r in results:
+        print(f"{name:<20} {r['seconds']:8.2f} {r['pages']:6d} {r['requests']:9d} "
+              f"{r['bytes'] / 1024:9.0f} {r['pages'] / r['seconds']:8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--branching", type=int, default=2, help="links from each page to new pages")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--pool", type=int, nargs="+", default=[4, 10, 32], help="max connections / concurrency")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
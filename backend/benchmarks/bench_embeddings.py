@@ -0,0 +1,51 @@
+"""Benchmark embedding throughput (chunks/sec) for each embedding backend.
+
+Usage (from backend/):
+    python -m benchmarks.bench_embeddings --chunks 5000 --backends gpu torch onnx onnx-int8 multiprocess
+"""
+import argparse
+import time
+
+from utils.chunker import chunk_scraped_data
+from vector_db.embedding_functions import GPUEmbeddingFunction
+from vector_db.embeddings import get_backend
+from webscrape.extractors import extract_page
+from .fixtures import load_fixtures
+
+
+def sample_chunks(count):
+    chunks = []
+    pages = load_fixtures(max(count // 20, 10))
+    while len(chunks) < count:
+        for url, html in pages:
+            chunks.extend(c['text'] for c in chunk_scraped_data([extract_page(url, html)[0]]))
+    return chunks[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--backends", nargs="+", default=["gpu", "torch", "onnx", "onnx-int8"],
+                        help="gpu is the original GPUEmbeddingFunction (list output) baseline")
+    args = parser.parse_args()
+
+    texts = sample_chunks(args.chunks)
+    print(f"Embedding {len(texts)} chunks")
+    for name in args.backends:
+        if name == "gpu":
+            embed = GPUEmbeddingFunction()
+            embed(texts[:8])  # load the model outside the timed region
+        else:
+            backend = get_backend(name)
+            backend.encode(texts[:8])
+            embed = backend.encode
+        start = time.perf_counter()
+        embed(texts)
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<14} {len(texts) / elapsed:9.1f} chunks/sec")
+        if hasattr(embed, "__self__") and hasattr(embed.__self__, "close"):
+            embed.__self__.close()
+
+
+if __name__ == "__main__":
+    main()
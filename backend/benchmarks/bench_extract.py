@@ -0,0 +1,104 @@
+"""Compare HTML extractors: parity with the BeautifulSoup reference and pages/sec.
+
+Runs every extractor in webscrape.extractors over PARITY_CASES, small
+pages exercising markup the fixtures may not contain, and the saved
+stir.ac.uk fixtures (python -m benchmarks.fixtures <url> ... to save some;
+synthetic pages otherwise). Each page's page_data and links are checked
+against the bs4 output and any differences are listed. The exit status is
+1 if an extractor named in --strict disagrees with bs4 on any page.
+
+Usage (from backend/):
+    python -m benchmarks.bench_extract --pages 400
+    python -m benchmarks.bench_extract --extractors bs4 lxml --strict lxml
+"""
+import argparse
+import sys
+import time
+
+from webscrape.extractors import EXTRACTORS, extract_page
+from .fixtures import load_fixtures
+
+# (name, html) pages covering comments, removed tags, nesting and declarations
+PARITY_CASES = [
+    ("comment-tail", '<div><!-- CMS block -->Opening hours 9-5</div><p>Library</p>'),
+    ("comments-everywhere", '<!-- top --><html><head><!-- h --><title>T<!-- t -->itle</title></head>'
+                            '<body><ul><li>One<!-- x --> two</li><!-- between --><li>Three</li></ul>'
+                            '<p>a<!--c-->b</p></body></html>'),
+    ("processing-instruction", '<html><body><p>before<?php echo 1; ?>after</p></body></html>'),
+    ("script-style-tails", '<html><head><style>p{color:red}</style>head tail</head><body>'
+                           '<p>Fees<script>var x = "<p>hidden</p>";</script> from 2025</p>'
+                           '<div><style>.a{}</style>Campus map</div><script>1</script>end</body></html>'),
+    ("nested-headings", '<html><body><h1>Study <span>here</span><h2>Undergraduate</h2></h1>'
+                        '<h3>Entry <em>requirements</em></h3><h2></h2></body></html>'),
+    ("xml-declaration", '<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 '
+                        'Strict//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-strict.dtd">\n'
+                        '<html xmlns="http://www.w3.org/1999/xhtml"><head><title>XHTML page</title></head>'
+                        '<body><p>Hello <a href="/x">x</a></p><br/>Line</body></html>'),
+    ("xhtml-no-declaration", '<html xmlns="http://www.w3.org/1999/xhtml"><head><title>X</title></head>'
+                             '<body><h1>Head</h1><p>Body</p></body></html>'),
+    ("hidden-text", '<html><body><template><p>tpl</p></template><ruby>Kan<rp>(</rp><rt>k</rt><rp>)</rp></ruby>'
+                    '<a href>empty</a><a href=" rel ">rel</a><a>none</a></body></html>'),
+    ("malformed", '<p>unclosed <div>div<li>item<td>cell</table> text'),
+    ("empty", ''),
+    ("text-only", 'plain text, no markup'),
+]
+
+
+def differences(reference, result):
+    """Fields of (page_data, links) where result differs from reference."""
+    (ref_page, ref_links), (page, links) = reference, result
+    fields = [key for key in ref_page if ref_page[key] != page.get(key)]
+    if ref_links != links:
+        fields.append('links')
+    return fields
+
+
+def pages_per_sec(extract, pages, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for url, html in pages:
+            extract(url, html)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(pages) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--extractors", nargs="+", default=list(EXTRACTORS), choices=list(EXTRACTORS))
+    parser.add_argument("--repeat", type=int, default=3, help="timing passes; the best is reported")
+    parser.add_argument("--strict", nargs="*", default=["lxml"], help="extractors that must match bs4 exactly")
+    args = parser.parse_args()
+
+    pages = [(f"https://www.stir.ac.uk/parity/{name}/", html) for name, html in PARITY_CASES]
+    pages += load_fixtures(args.pages)
+    references = [extract_page(url, html) for url, html in pages]
+    print(f"Extracting {len(pages)} pages")
+
+    failed = False
+    baseline = None
+    for name in args.extractors:
+        extract = EXTRACTORS[name]
+        try:
+            results = [extract(url, html) for url, html in pages]
+        except ImportError as e:
+            print(f"  {name:<12} skipped: {e}")
+            continue
+        mismatched = [(url, fields) for (url, _), reference, result in zip(pages, references, results)
+                      if (fields := differences(reference, result))]
+        rate = pages_per_sec(extract, pages, args.repeat)
+        baseline = baseline or rate
+        print(f"  {name:<12} {rate:8.1f} pages/sec  ({rate / baseline:.2f}x)  "
+              f"{len(pages) - len(mismatched)}/{len(pages)} pages match bs4")
+        for url, fields in mismatched[:5]:
+            print(f"      {url}: {', '.join(fields)} differ")
+        if mismatched and name in args.strict:
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
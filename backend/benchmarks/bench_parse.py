@@ -0,0 +1,49 @@
+"""Benchmark HTML parsing throughput against the number of parser processes.
+
+Usage (from backend/):
+    python -m benchmarks.bench_parse --pages 400 --workers 0 1 2 4 8
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from webscrape.extractors import extract_page
+from .fixtures import load_fixtures
+
+
+def run(pages, workers):
+    """Seconds to parse pages; pool startup and worker imports are not timed."""
+    urls = [url for url, _ in pages]
+    htmls = [html for _, html in pages]
+    if workers == 0:
+        start = time.perf_counter()
+        for url, html in pages:
+            extract_page(url, html)
+        return time.perf_counter() - start
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Spawn every worker and import the extractor before the clock starts
+        list(executor.map(extract_page, urls[:workers * 2], htmls[:workers * 2]))
+        start = time.perf_counter()
+        list(executor.map(extract_page, urls, htmls, chunksize=4))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.pages)
+    print(f"Parsing {len(pages)} pages")
+    baseline = None
+    for workers in args.workers:
+        elapsed = run(pages, workers)
+        rate = len(pages) / elapsed
+        baseline = baseline or rate
+        label = "inline" if workers == 0 else f"{workers} workers"
+        print(f"  {label:<12} {rate:8.1f} pages/sec  ({rate / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
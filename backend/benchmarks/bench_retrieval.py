@@ -0,0 +1,186 @@
+"""Offline retrieval benchmark: recall@k, MRR, latency, ingest throughput and index size.
+
+No LLM is involved. Questions and labeled target URLs come from
+tests/test_data.py; a hit is relevant when its URL starts with a target.
+The corpus is either a real chunk file or a synthetic one, where each
+ground-truth answer is planted at its target URL among --synthetic
+distractor chunks, so results are comparable as the index grows.
+
+Usage (from backend/):
+    python -m benchmarks.bench_retrieval --synthetic 100000 --modes vector lexical hybrid
+    python -m benchmarks.bench_retrieval --corpus chunked_data.jsonl --db-path ./chroma_db --skip-ingest
+    python -m benchmarks.bench_retrieval --synthetic 1000000 --pipelined --output results/retrieval_1m
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from tests.test_data import get_retrieval_cases
+from utils.metrics import percentile
+from utils.records import RecordWriter
+from vector_db.query import SEARCH_MODES, embedding_cache, result_cache, retrieve
+from .fixtures import _WORDS
+
+K_VALUES = (1, 3, 5, 10)
+
+
+def synthetic_chunks(count, cases, seed=0):
+    """Yield chunk records: the planted answers, then `count` distractors.
+
+    Distractors use the fixture vocabulary with a sprinkling of words from
+    the questions, so they compete with the answers lexically as well as
+    semantically.
+    """
+    rng = random.Random(seed)
+    for i, (question, ground_truth, urls) in enumerate(cases):
+        yield {'url': urls[0], 'title': f"Answer {i} | University of Stirling", 'chunk_index': i,
+               'text': ground_truth}
+
+    question_words = sorted({w.strip("?,.").lower() for q, _, _ in cases for w in q.split()})
+    for i in range(count):
+        words = [rng.choice(question_words if rng.random() < 0.01 else _WORDS)
+                 for _ in range(rng.randint(60, 180))]
+        yield {
+            'url': f"https://www.stir.ac.uk/synthetic/page-{i // 8}/",
+            'title': f"Page {i // 8} | University of Stirling",
+            'chunk_index': i % 8,
+            'text': " ".join(words).capitalize() + ".",
+        }
+
+
+def write_corpus(path, count, cases):
+    with RecordWriter(path) as writer:
+        writer.write_many(synthetic_chunks(count, cases))
+        return writer.count
+
+
+def directory_size(path):
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+
+def first_relevant_rank(hits, urls):
+    for rank, hit in enumerate(hits, 1):
+        if any(hit['url'].startswith(url) for url in urls):
+            return rank
+    return None
+
+
+def evaluate_config(cases, mode, db_path, rerank=False, repeat=1):
+    """Recall@k, MRR and query latency for one search configuration, with cold caches."""
+    k_max = max(K_VALUES)
+    ranks = []
+    latencies = []
+    for _ in range(repeat):
+        embedding_cache.clear()
+        result_cache.clear()
+        ranks = []
+        for question, _, urls in cases:
+            start = time.perf_counter()
+            if rerank:
+                from vector_db.rerank import rerank as rerank_hits
+                hits, _ = rerank_hits(question, retrieve(question, 30, mode, db_path), token_budget=10 ** 6,
+                                      max_per_url=k_max)
+                hits = hits[:k_max]
+            else:
+                hits = retrieve(question, k_max, mode, db_path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            ranks.append(first_relevant_rank(hits, urls))
+
+    result = {f"recall@{k}": sum(1 for r in ranks if r and r <= k) / len(ranks) for k in K_VALUES}
+    result["mrr"] = sum(1 / r for r in ranks if r) / len(ranks)
+    result.update({f"latency_p{p}_ms": percentile(latencies, p) for p in (50, 95, 99)})
+    return result
+
+
+def markdown_report(report):
+    corpus = report["corpus"]
+    lines = [
+        f"# Retrieval benchmark ({corpus['chunks']} chunks)",
+        "",
+        f"Ingest: {corpus['ingest_seconds']:.1f}s ({corpus['chunks_per_sec']:.0f} chunks/s), "
+        f"index size {corpus['index_bytes'] / 1e6:.1f} MB",
+        "",
+        "| config | " + " | ".join(f"R@{k}" for k in K_VALUES) + " | MRR | p50 ms | p95 ms | p99 ms |",
+        "|---" * (len(K_VALUES) + 5) + "|",
+    ]
+    for name, r in report["results"].items():
+        lines.append(
+            f"| {name} | " + " | ".join(f"{r[f'recall@{k}']:.2f}" for k in K_VALUES)
+            + f" | {r['mrr']:.3f} | {r['latency_p50_ms']:.1f} | {r['latency_p95_ms']:.1f}"
+            f" | {r['latency_p99_ms']:.1f} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="chunk file to ingest (JSONL, .gz/.zst or JSON array)")
+    parser.add_argument("--synthetic", type=int, default=10000, help="distractor chunks when no --corpus")
+    parser.add_argument("--db-path", help="database directory (default: a temporary directory)")
+    parser.add_argument("--skip-ingest", action="store_true", help="benchmark the existing --db-path as is")
+    parser.add_argument("--pipelined", action="store_true", help="ingest with the pipelined loader")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--backend", help="embedding backend (torch, onnx, onnx-int8, multiprocess)")
+    parser.add_argument("--modes", nargs="+", default=list(SEARCH_MODES), choices=SEARCH_MODES)
+    parser.add_argument("--rerank", action="store_true", help="also benchmark hybrid + cross-encoder rerank")
+    parser.add_argument("--repeat", type=int, default=3, help="query passes per config for latency")
+    parser.add_argument("--output", help="write <output>.json and <output>.md")
+    args = parser.parse_args()
+
+    from vector_db import load_data, set_embedding_backend
+    if args.backend:
+        set_embedding_backend(args.backend)
+
+    cases = get_retrieval_cases()
+    workdir = tempfile.mkdtemp(prefix="bench_retrieval_")
+    db_path = args.db_path or os.path.join(workdir, "chroma_db")
+
+    corpus = {"chunks": None, "ingest_seconds": 0.0, "chunks_per_sec": 0.0}
+    if not args.skip_ingest:
+        corpus_path = args.corpus
+        if corpus_path is None:
+            corpus_path = os.path.join(workdir, "corpus.jsonl.gz")
+            start = time.perf_counter()
+            corpus["chunks"] = write_corpus(corpus_path, args.synthetic, cases)
+            print(f"Generated {corpus['chunks']} chunks in {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        stats = load_data(corpus_path, batch_size=args.batch_size, db_path=db_path, pipelined=args.pipelined)
+        corpus["ingest_seconds"] = time.perf_counter() - start
+        corpus["chunks"] = stats["embedded"]
+        corpus["chunks_per_sec"] = stats["embedded"] / corpus["ingest_seconds"]
+    if corpus["chunks"] is None:
+        from vector_db.store import get_store
+        corpus["chunks"] = get_store(db_path).collection.count()
+    corpus["index_bytes"] = directory_size(db_path)
+
+    configs = [(mode, mode, False) for mode in args.modes]
+    if args.rerank:
+        configs.append(("hybrid+rerank", "hybrid", True))
+    results = {}
+    for name, mode, rerank in configs:
+        results[name] = evaluate_config(cases, mode, db_path, rerank, args.repeat)
+        print(f"{name}: {results[name]}")
+
+    report = {
+        "corpus": corpus,
+        "config": {"backend": args.backend or os.environ.get("STIRBOT_EMBEDDING_BACKEND", "gpu"),
+                   "pipelined": args.pipelined, "questions": len(cases)},
+        "results": results,
+    }
+    print()
+    print(markdown_report(report))
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{args.output}.json", "w") as f:
+            json.dump(report, f, indent=2)
+        with open(f"{args.output}.md", "w") as f:
+            f.write(markdown_report(report))
+        print(f"Report saved to {args.output}.json and {args.output}.md")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Saved HTML fixtures for scraper benchmarks.
+
+Fixtures live in benchmarks/fixtures/ as <name>.html files. Real pages can be
+saved with `python -m benchmarks.fixtures URL [URL ...]`; when the directory
+is empty, stir.ac.uk-like pages (navigation, cookie banner, footer, body
+sections and links) are synthesized instead so the benchmarks always run.
+"""
+import asyncio
+import random
+import sys
+from pathlib import Path
+from urllib.parse import urlparse
+
+import httpx
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+_WORDS = (
+    "student university campus course study research library accommodation fees "
+    "international undergraduate postgraduate stirling scotland support teaching "
+    "module semester application funding scholarship faculty degree programme"
+).split()
+
+
+def synthetic_page(i, rng=None, paragraphs=40):
+    """Build a stir.ac.uk-shaped HTML page for page number i."""
+    rng = rng or random.Random(i)
+
+    def sentence():
+        return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+    nav = "".join(f'<li><a href="/section-{n}/">Section {n}</a></li>' for n in range(30))
+    body = []
+    for p in range(paragraphs):
+        if p % 8 == 0:
+            body.append(f"<h2>Heading {i}-{p}</h2>")
+        body.append("<p>" + " ".join(sentence() for _ in range(rng.randint(2, 6))) + "</p>")
+        if p % 5 == 0:
+            body.append(f'<a href="/page-{rng.randint(0, 100000)}/">Related page</a>')
+    return f"""<!DOCTYPE html>
+<html><head><title>Page {i} | University of Stirling</title>
+<style>body {{ font-family: sans-serif; }}</style>
+<script>window.dataLayer = window.dataLayer || [];</script></head>
+<body>
+<div class="cookie-banner">We use cookies to improve your experience on our website.</div>
+<nav><ul>{nav}</ul></nav>
+<main><h1>Page {i}</h1>{''.join(body)}</main>
+<footer><p>University of Stirling, Stirling, FK9 4LA, Scotland, UK</p>
+<a href="/privacy/">Privacy</a> <a href="/accessibility/">Accessibility</a></footer>
+</body></html>"""
+
+
+def load_fixtures(count=200, fixtures_dir=FIXTURES_DIR):
+    """Return [(url, html), ...] from saved fixtures, or synthetic pages."""
+    files = sorted(Path(fixtures_dir).glob("*.html")) if Path(fixtures_dir).exists() else []
+    if files:
+        pages = [(f"https://www.stir.ac.uk/{f.stem.replace('__', '/')}/", f.read_text(encoding="utf-8"))
+                 for f in files]
+        return [pages[i % len(pages)] for i in range(max(count, len(pages)))]
+    return [(f"https://www.stir.ac.uk/page-{i}/", synthetic_page(i)) for i in range(count)]
+
+
+async def save_fixtures(urls, fixtures_dir=FIXTURES_DIR):
+    """Download pages and save them as fixtures."""
+    Path(fixtures_dir).mkdir(parents=True, exist_ok=True)
+    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+        for url in urls:
+            response = await client.get(url)
+            response.raise_for_status()
+            name = urlparse(url).path.strip("/").replace("/", "__") or "index"
+            (Path(fixtures_dir) / f"{name}.html").write_text(response.text, encoding="utf-8")
+            print(f"Saved {url}")
+
+
+if __name__ == "__main__":
+    asyncio.run(save_fixtures(sys.argv[1:] or ["https://www.stir.ac.uk/"]))
@@ -0,0 +1,158 @@
+"""Load test the RAG HTTP service: latency percentiles and requests/sec.
+
+Fires --requests chat (or search) requests with --concurrency in flight and
+reports p50/p95/p99 latency, time to first token and throughput.
+
+Usage (from backend/):
+    python -m service --port 8080 &
+    python -m benchmarks.load_test --url http://127.0.0.1:8080 --concurrency 32 --requests 500
+
+    # Start the service against the stub Ollama so the LLM isn't the bottleneck
+    python -m benchmarks.load_test --stub-llm --concurrency 32 --requests 500
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import httpx
+
+from utils.metrics import percentile
+from .fixtures import _WORDS
+
+QUESTIONS = [
+    "What undergraduate courses are available?",
+    "How do I apply for accommodation?",
+    "Where is the university library?",
+    "What are the tuition fees for international students?",
+    "Which sports facilities are on campus?",
+]
+
+
+def make_question(i, unique):
+    """Cycle a few fixed questions, or with unique=True vary every one so caches miss."""
+    question = QUESTIONS[i % len(QUESTIONS)]
+    if unique:
+        question += " " + " ".join(_WORDS[(i * 7 + j) % len(_WORDS)] for j in range(3))
+    return question
+
+
+async def one_request(client, url, endpoint, question):
+    start = time.perf_counter()
+    ttft = None
+    if endpoint == "search":
+        response = await client.post(f"{url}/search", json={"query": question})
+        response.raise_for_status()
+        return time.perf_counter() - start, None, response.status_code
+    async with client.stream("POST", f"{url}/chat", json={"question": question}) as response:
+        if response.status_code != 200:
+            await response.aread()
+            return time.perf_counter() - start, None, response.status_code
+        async for line in response.aiter_lines():
+            if ttft is None and line and "token" in json.loads(line):
+                ttft = time.perf_counter() - start
+    return time.perf_counter() - start, ttft, 200
+
+
+async def run(url, endpoint, total, concurrency, unique):
+    latencies, ttfts, statuses = [], [], {}
+    counter = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        async def worker():
+            for i in counter:
+                try:
+                    latency, ttft, status = await one_request(client, url, endpoint, make_question(i, unique))
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+                    continue
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(latency)
+                    if ttft is not None:
+                        ttfts.append(ttft)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+        stats = (await client.get(f"{url}/stats")).json()
+
+    return {
+        "endpoint": endpoint,
+        "requests": total,
+        "concurrency": concurrency,
+        "ok": len(latencies),
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "wall_seconds": wall,
+        "requests_per_sec": len(latencies) / wall if wall else 0.0,
+        "latency_ms": {f"p{p}": percentile(latencies, p) * 1000 for p in (50, 95, 99)},
+        "ttft_ms": {f"p{p}": percentile(ttfts, p) * 1000 for p in (50, 95, 99)} if ttfts else None,
+        "service": stats,
+    }
+
+
+def start_service(port, stub_port, ttft, token_delay):
+    """Start the stub Ollama and the service as subprocesses; returns both Popen handles."""
+    stub = subprocess.Popen([sys.executable, "-m", "llm_interface.stub_server", "--port", str(stub_port),
+                             "--ttft", str(ttft), "--token-delay", str(token_delay)])
+    service = subprocess.Popen([sys.executable, "-m", "service", "--port", str(port),
+                                "--ollama-host", f"http://127.0.0.1:{stub_port}"])
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return stub, service
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    stub.terminate()
+    service.terminate()
+    raise RuntimeError("Service did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--endpoint", choices=["chat", "search"], default="chat")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--unique", action="store_true", help="make every question distinct (cold caches)")
+    parser.add_argument("--stub-llm", action="store_true",
+                        help="start the stub Ollama and the service on --port before testing")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--stub-port", type=int, default=11435)
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    processes = ()
+    url = args.url
+    if args.stub_llm:
+        processes = start_service(args.port, args.stub_port, args.ttft, args.token_delay)
+        url = f"http://127.0.0.1:{args.port}"
+    try:
+        report = asyncio.run(run(url, args.endpoint, args.requests, args.concurrency, args.unique))
+    finally:
+        for process in processes:
+            process.terminate()
+
+    print(f"{report['ok']}/{report['requests']} ok at concurrency {report['concurrency']} "
+          f"in {report['wall_seconds']:.1f}s ({report['requests_per_sec']:.1f} req/s)")
+    print("Latency ms: " + ", ".join(f"{k} {v:.0f}" for k, v in report["latency_ms"].items()))
+    if report["ttft_ms"]:
+        print("TTFT ms:    " + ", ".join(f"{k} {v:.0f}" for k, v in report["ttft_ms"].items()))
+    print(f"Statuses: {report['statuses']}")
+    print(f"Embedding batches: {report['service']['embedding_batcher']}")
+    if report["service"].get("answer_cache"):
+        print(f"Answer cache: {report['service']['answer_cache']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
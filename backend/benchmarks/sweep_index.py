@@ -0,0 +1,183 @@
+"""Sweep HNSW and PCA settings: ANN recall vs query latency vs index size.
+
+Every (space, M, ef_construction, pca_dims) combination is built from the
+same corpus into its own database, then queried at each ef_search. Recall@k
+is measured against exact cosine nearest neighbours over the full-size
+embeddings, so it captures both HNSW approximation and PCA loss. The exact
+search keeps all embeddings in memory, so keep --chunks to a few hundred
+thousand.
+
+Usage (from backend/):
+    python -m benchmarks.sweep_index --chunks 50000 --M 8 16 32 --ef-search 16 32 64 128 --pca 0 128 64 \\
+        --output results/hnsw_sweep
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import tempfile
+import time
+from dataclasses import asdict, replace
+from pathlib import Path
+
+import numpy as np
+
+from tests.test_data import get_retrieval_cases
+from utils.records import iter_records
+from vector_db.index_config import IndexConfig, SPACES
+from .bench_retrieval import directory_size, percentile, write_corpus
+
+
+def embed_all(texts, embed, batch_size=1000):
+    chunks = [np.asarray(embed(texts[i:i + batch_size]), dtype=np.float32)
+              for i in range(0, len(texts), batch_size)]
+    embeddings = np.vstack(chunks)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def exact_neighbours(corpus, queries, k, block=1024):
+    """Indices of the k most similar corpus rows for each query, by brute force."""
+    result = []
+    for i in range(0, len(queries), block):
+        scores = queries[i:i + block] @ corpus.T
+        top = np.argpartition(-scores, k, axis=1)[:, :k]
+        order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+        result.append(np.take_along_axis(top, order, axis=1))
+    return np.vstack(result)
+
+
+def sample_queries(texts, count, seed=0):
+    """Benchmark questions plus short prefixes of random chunks as queries."""
+    rng = random.Random(seed)
+    queries = [question for question, _, _ in get_retrieval_cases()]
+    while len(queries) < count:
+        queries.append(" ".join(rng.choice(texts).split()[:12]))
+    return queries[:count]
+
+
+def measure(store, query_embeddings, truth_ids, k):
+    latencies = []
+    recalls = []
+    collection = store.collection
+    for embedding, truth in zip(query_embeddings, truth_ids):
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[store.transform(embedding)], n_results=k,
+                                  include=["distances"])
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(set(result["ids"][0]) & truth) / k)
+    return {
+        "recall": sum(recalls) / len(recalls),
+        **{f"latency_p{p}_ms": percentile(latencies, p) for p in (50, 95, 99)},
+    }
+
+
+def plot(results, path):
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib is not installed, skipping the chart")
+        return
+    fig, ax = plt.subplots(figsize=(9, 6))
+    builds = {}
+    for r in results:
+        builds.setdefault(r["build"], []).append(r)
+    for name, points in builds.items():
+        points.sort(key=lambda r: r["ef_search"])
+        ax.plot([r["latency_p50_ms"] for r in points], [r["recall"] for r in points], alpha=0.5)
+        ax.scatter([r["latency_p50_ms"] for r in points], [r["recall"] for r in points],
+                   s=[max(r["index_bytes"] / 1e6, 5) for r in points], label=name, alpha=0.7)
+    ax.set_xlabel("p50 query latency (ms)")
+    ax.set_ylabel("recall@k vs exact search")
+    ax.set_title("HNSW sweep (marker area = index size in MB)")
+    ax.legend(fontsize=7)
+    ax.grid(alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+    print(f"Chart saved to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="chunk file (default: synthetic, see bench_retrieval)")
+    parser.add_argument("--chunks", type=int, default=20000, help="synthetic distractor chunks")
+    parser.add_argument("--space", nargs="+", default=["cosine"], choices=SPACES)
+    parser.add_argument("--M", nargs="+", type=int, default=[16])
+    parser.add_argument("--ef-construction", nargs="+", type=int, default=[100])
+    parser.add_argument("--ef-search", nargs="+", type=int, default=[16, 32, 64, 128, 256])
+    parser.add_argument("--pca", nargs="+", type=int, default=[0], help="0 keeps full-size vectors")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--output", help="write <output>.json, <output>.md and <output>.png")
+    args = parser.parse_args()
+
+    from vector_db import load_data
+    from vector_db.chroma_client import get_embedding_function
+    from vector_db.store import get_store
+
+    workdir = tempfile.mkdtemp(prefix="sweep_index_")
+    corpus_path = args.corpus
+    if corpus_path is None:
+        corpus_path = os.path.join(workdir, "corpus.jsonl.gz")
+        write_corpus(corpus_path, args.chunks, get_retrieval_cases())
+
+    # IDs and texts in ingest order (later duplicates of an ID replace earlier ones, as in Chroma)
+    chunks = {f"{c['url']}_{c['chunk_index']}": c['text'] for c in iter_records(corpus_path)}
+    ids = list(chunks)
+    texts = list(chunks.values())
+    print(f"Embedding {len(texts)} chunks for exact search...")
+    embed = get_embedding_function()
+    corpus = embed_all(texts, embed)
+    queries = sample_queries(texts, args.queries)
+    query_embeddings = embed_all(queries, embed)
+    truth = [{ids[i] for i in row} for row in exact_neighbours(corpus, query_embeddings, args.k)]
+
+    results = []
+    for space, m, ef_construction, pca in itertools.product(args.space, args.M, args.ef_construction, args.pca):
+        config = IndexConfig(space=space, M=m, ef_construction=ef_construction, pca_dims=pca or None)
+        build = f"{space} M={m} efc={ef_construction}" + (f" pca={pca}" if pca else "")
+        db_path = os.path.join(workdir, build.replace(" ", "_").replace("=", ""))
+        start = time.perf_counter()
+        load_data(corpus_path, db_path=db_path, index_config=config)
+        build_seconds = time.perf_counter() - start
+        store = get_store(db_path)
+        index_bytes = directory_size(db_path)
+        dims = pca or corpus.shape[1]
+        for ef_search in args.ef_search:
+            store.set_index_config(replace(config, ef_search=ef_search))
+            row = {
+                "build": build, **asdict(config), "ef_search": ef_search,
+                "build_seconds": build_seconds, "index_bytes": index_bytes,
+                "vector_bytes": len(ids) * dims * 4,
+                **measure(store, query_embeddings, truth, args.k),
+            }
+            results.append(row)
+            print(f"{build} ef={ef_search}: recall {row['recall']:.3f}, "
+                  f"p50 {row['latency_p50_ms']:.2f} ms, index {index_bytes / 1e6:.1f} MB")
+
+    lines = [
+        f"# HNSW sweep ({len(ids)} chunks, {len(queries)} queries, recall@{args.k})",
+        "",
+        "| build | ef_search | recall | p50 ms | p95 ms | build s | index MB | vectors MB |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    for r in results:
+        lines.append(f"| {r['build']} | {r['ef_search']} | {r['recall']:.3f} | {r['latency_p50_ms']:.2f} | "
+                     f"{r['latency_p95_ms']:.2f} | {r['build_seconds']:.1f} | {r['index_bytes'] / 1e6:.1f} | "
+                     f"{r['vector_bytes'] / 1e6:.1f} |")
+    markdown = "\n".join(lines) + "\n"
+    print()
+    print(markdown)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{args.output}.json", "w") as f:
+            json.dump({"chunks": len(ids), "queries": len(queries), "k": args.k, "results": results}, f, indent=2)
+        with open(f"{args.output}.md", "w") as f:
+            f.write(markdown)
+        plot(results, f"{args.output}.png")
+
+
+if __name__ == "__main__":
+    main()
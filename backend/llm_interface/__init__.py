@@ -1 +1 @@
-from .llm import chat
\ No newline at end of file
+from .llm import SYSTEM_PROMPT, chat, chat_stream, achat, achat_stream
@@ -1,7 +1,18 @@
+import asyncio
+import time
+import weakref
+
 import ollama
 
+from utils import metrics
+
+SYSTEM_PROMPT = (
+    "You are a helpful chatbot that returns relevant appropriate answers for people interested in "
+    "knowing more about stirling university. Give Citations about where you got your answers from."
+)
+
 
-def chat(prompt,context, model = 'ministral-3', system_prompt = None,):
+def build_messages(prompt, context, system_prompt=None):
     messages = []
     prompt_enigneered_message = f"Use this context: {context} to answer this user query: {prompt}"
 
@@ -15,7 +26,156 @@ def chat(prompt,context, model = 'ministral-3', system_prompt = None,):
         'role': 'user',
         'content': prompt_enigneered_message
     })
+    return messages
+
+
+metrics.set_buckets("chat_tokens_per_sec", (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 400))
+
+_clients = {}
+# AsyncClient connections belong to the event loop they were opened on
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_client(host=None, asynchronous=False):
+    """Reuse one ollama Client per host, or AsyncClient per host and event loop.
+
+    host=None uses OLLAMA_HOST or localhost.
+    """
+    if asynchronous:
+        clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+        if host not in clients:
+            clients[host] = ollama.AsyncClient(host=host)
+        return clients[host]
+    if host not in _clients:
+        _clients[host] = ollama.Client(host=host)
+    return _clients[host]
 
-    response = ollama.chat(model=model, messages=messages)
+
+def chat(prompt,context, model = 'ministral-3', system_prompt = None, host = None):
+    messages = build_messages(prompt, context, system_prompt)
+    with metrics.span("chat", model=model):
+        response = get_client(host).chat(model=model, messages=messages)
     return response['message']['content']
 
+
+class StreamStats:
+    """Timing for one streamed generation: time to first token and tokens/sec.
+
+    Uses Ollama's eval_count/eval_duration from the final message when the
+    server reports them, otherwise counts streamed chunks over wall time.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_token = None
+        self.end = None
+        self.chunks = 0
+        self.eval_count = None
+        self.eval_duration = None
+
+    def on_chunk(self, part):
+        if part['message']['content']:
+            if self.first_token is None:
+                self.first_token = time.perf_counter()
+            self.chunks += 1
+        if part.get('done'):
+            self.end = time.perf_counter()
+            self.eval_count = part.get('eval_count')
+            self.eval_duration = part.get('eval_duration')
+            self.record()
+
+    def record(self):
+        """Report the finished generation to utils.metrics."""
+        if not metrics.enabled():
+            return
+        metrics.observe("chat_seconds", self.total_time)
+        if self.time_to_first_token is not None:
+            metrics.observe("chat_time_to_first_token_seconds", self.time_to_first_token)
+        metrics.observe("chat_tokens_per_sec", self.tokens_per_sec)
+        metrics.inc("chat_tokens_total", self.tokens)
+
+    @property
+    def time_to_first_token(self):
+        return self.first_token - self.start if self.first_token else None
+
+    @property
+    def total_time(self):
+        return (self.end or time.perf_counter()) - self.start
+
+    @property
+    def tokens(self):
+        return self.eval_count or self.chunks
+
+    @property
+    def tokens_per_sec(self):
+        if self.eval_count and self.eval_duration:
+            return self.eval_count / (self.eval_duration / 1e9)
+        generation = self.total_time - (self.time_to_first_token or 0)
+        return self.chunks / generation if generation > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            'time_to_first_token': self.time_to_first_token,
+            'total_time': self.total_time,
+            'tokens': self.tokens,
+            'tokens_per_sec': self.tokens_per_sec,
+        }
+
+
+class ChatStream:
+    """Iterator over answer tokens as Ollama generates them; .stats fills in as it runs."""
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.stats = StreamStats()
+        self.text = []
+
+    def __iter__(self):
+        for part in self.parts:
+            self.stats.on_chunk(part)
+            token = part['message']['content']
+            if token:
+                self.text.append(token)
+                yield token
+
+    @property
+    def answer(self):
+        return "".join(self.text)
+
+
+class AsyncChatStream(ChatStream):
+    """Async iterator over answer tokens, backed by ollama.AsyncClient."""
+
+    def __init__(self, parts):
+        super().__init__(None)
+        self.request = parts
+
+    async def __aiter__(self):
+        async for part in await self.request:
+            self.stats.on_chunk(part)
+            token = part['message']['content']
+            if token:
+                self.text.append(token)
+                yield token
+
+
+def chat_stream(prompt, context, model='ministral-3', system_prompt=None, host=None):
+    """Like chat, but returns a ChatStream that yields tokens as they arrive."""
+    messages = build_messages(prompt, context, system_prompt)
+    return ChatStream(get_client(host).chat(model=model, messages=messages, stream=True))
+
+
+def achat_stream(prompt, context, model='ministral-3', system_prompt=None, host=None):
+    """Async chat_stream: `async for token in achat_stream(...)`."""
+    messages = build_messages(prompt, context, system_prompt)
+    return AsyncChatStream(get_client(host, asynchronous=True).chat(model=model, messages=messages, stream=True))
+
+
+async def achat(prompt, context, model='ministral-3', system_prompt=None, host=None, stats=None):
+    """Async chat returning the full answer. Pass a dict as stats to receive the stream timings."""
+    stream = achat_stream(prompt, context, model, system_prompt, host)
+    async for _ in stream:
+        pass
+    if stats is not None:
+        stats.update(stream.stats.as_dict())
+    return stream.answer
@@ -0,0 +1,101 @@
+"""Stand-in Ollama HTTP server for tests, benchmarks and load tests.
+
+Answers POST /api/chat like Ollama does, streaming NDJSON when asked, after
+a configurable prompt-processing delay and per-token delay. No model runs.
+
+    python -m llm_interface.stub_server --port 11435 --ttft 0.2 --token-delay 0.02
+    OLLAMA_HOST=http://127.0.0.1:11435 python main.py
+"""
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ANSWER = (
+    "The University of Stirling campus is set within 330 acres beneath the Ochil Hills. "
+    "Source: https://www.stir.ac.uk/about/"
+)
+
+
+def make_handler(answer, ttft, token_delay):
+    tokens = [word + " " for word in answer.split()]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _message(self, model, content, done, **extra):
+            message = {
+                "model": model,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "message": {"role": "assistant", "content": content},
+                "done": done,
+            }
+            message.update(extra)
+            return message
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if self.path != "/api/chat":
+                self.send_error(404)
+                return
+            model = body.get("model", "stub")
+            start = time.perf_counter_ns()
+            time.sleep(ttft)
+            final = dict(done_reason="stop", eval_count=len(tokens), prompt_eval_count=0)
+
+            if not body.get("stream", True):
+                time.sleep(token_delay * len(tokens))
+                duration = time.perf_counter_ns() - start
+                payload = json.dumps(self._message(model, answer, True, total_duration=duration,
+                                                   eval_duration=int(token_delay * len(tokens) * 1e9) or 1,
+                                                   **final)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def send(obj):
+                line = json.dumps(obj).encode() + b"\n"
+                self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+
+            eval_start = time.perf_counter_ns()
+            for token in tokens:
+                send(self._message(model, token, False))
+                time.sleep(token_delay)
+            send(self._message(model, "", True, total_duration=time.perf_counter_ns() - start,
+                               eval_duration=time.perf_counter_ns() - eval_start, **final))
+            self.wfile.write(b"0\r\n\r\n")
+
+    return Handler
+
+
+def start_stub_server(port=0, answer=DEFAULT_ANSWER, ttft=0.0, token_delay=0.0):
+    """Start the stub in a background thread. Returns (server, "http://127.0.0.1:<port>")."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(answer, ttft, token_delay))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--ttft", type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between tokens")
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(DEFAULT_ANSWER, args.ttft, args.token_delay))
+    print(f"Stub Ollama listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
@@ -1,33 +1,202 @@
+"""Stirbot pipeline: crawl -> chunk -> ingest, plus chat and evaluation.
+
+    python main.py run            # bring every stage up to date
+    python main.py chunk --chunk-size 800
+    python main.py status
+    python main.py chat
+    python main.py evaluate
+
+Each stage records a fingerprint of its config and inputs (chunk settings,
+embedding model, hashes of the pages and chunk files) in
+pipeline_state.json and is skipped while that fingerprint and its outputs
+are unchanged. The crawl is refreshed with --force crawl or
+--crawl-max-age. Changing only the chunking settings re-chunks the saved
+pages and re-ingests (incrementally) without re-crawling; changing the
+embedding model or index settings rebuilds the collection. When the crawl
+does run, pages are chunked as they arrive instead of in a second pass,
+and ingest uses the pipelined loader.
+"""
+import argparse
 import asyncio
+import os
 import sys
-from webscrape import scraper
+import time
+from dataclasses import asdict
+
+from webscrape import CrawlCache, scraper
 from vector_db import load_data
-from vector_db import search
-from llm_interface import chat
-from tests.evaluate_rag import run_evaluation
+from vector_db import search_hits, get_answer_cache
+from vector_db.query import format_context
+from llm_interface import SYSTEM_PROMPT, chat_stream
+from utils import metrics
+from utils.pipeline_state import PipelineState, file_hash, fingerprint
 
 CHUNK_SIZE = 1000
+# Token-based chunking instead of CHUNK_SIZE characters when set
+MAX_TOKENS = None
+CHUNK_OVERLAP = 32
 LLM_MODEL = "Mistral"
+SEARCH_MODE = "hybrid"
+RERANK = True
+CONTEXT_TOKEN_BUDGET = 800
+ANSWER_CACHE = True
 
-
-def scrape():
-    """Scrape the entire Stir University website and save chunked data."""
-    asyncio.run(scraper.main(chunk_size=CHUNK_SIZE))
+PAGES_FILE = "scraped_pages.jsonl.gz"
+CHUNKS_FILE = "chunked_data.jsonl"
+CRAWL_CACHE = "crawl_cache.db"
+DB_PATH = "./chroma_db"
+STAGES = ("crawl", "chunk", "ingest")
 
 
-def ingest():
-    """Load scraped data into ChromaDB."""
-    load_data("chunked_data.json")
-
 def evaluate():
     """Run RAGAS evaluation on the RAG system."""
+    from tests.evaluate_rag import run_evaluation
     run_evaluation()
 
 
-def chatbot():
-    system_prompt = "You are a helpful chatbot that returns relevant appropriate answers for people interested in knowing more about stirling university." \
-    " Give Citations about where you got your answers from."
+class Pipeline:
+    """Runs crawl -> chunk -> ingest, skipping stages whose recorded fingerprint still matches."""
+
+    def __init__(self, args):
+        self.args = args
+        self.state = PipelineState(args.state)
+
+    def crawl_config(self):
+        return {
+            "site": scraper.SITE,
+            "sitemap": self.args.sitemap,
+            "extractor": self.args.extractor or os.environ.get("STIRBOT_EXTRACTOR", "lxml"),
+        }
+
+    def chunk_config(self):
+        return {
+            "chunk_size": self.args.chunk_size,
+            "max_tokens": self.args.max_tokens,
+            "chunk_overlap": self.args.chunk_overlap,
+            "dedup": self.args.dedup,
+        }
+
+    def ingest_config(self):
+        from vector_db.embeddings import DEFAULT_MODEL
+        from vector_db.index_config import IndexConfig
+        return {
+            "embedding_model": DEFAULT_MODEL,
+            "embedding_backend": os.environ.get("STIRBOT_EMBEDDING_BACKEND", "gpu"),
+            "db_path": self.args.db_path,
+            "index": asdict(IndexConfig.load(self.args.db_path)),
+        }
+
+    def fingerprints(self):
+        """{stage: fingerprint} for the current config and the recorded upstream outputs."""
+        crawl = self.state.get("crawl") or {}
+        chunk = self.state.get("chunk") or {}
+        return {
+            "crawl": fingerprint(self.crawl_config()),
+            "chunk": fingerprint({**self.chunk_config(), "pages": crawl.get("pages_hash")}),
+            "ingest": fingerprint({**self.ingest_config(), "corpus": chunk.get("corpus_hash")}),
+        }
+
+    def why_stale(self, stage, fingerprints):
+        """Reason stage needs to run, or None if it is up to date (ignoring upstream stages)."""
+        record = self.state.get(stage)
+        if stage in self.args.force:
+            return "forced"
+        if record is None:
+            return "never run"
+        if record["fingerprint"] != fingerprints[stage]:
+            return "config or input changed"
+        if not self.state.is_valid(stage, fingerprints[stage]):
+            return "outputs missing or modified"
+        max_age = self.args.crawl_max_age
+        if stage == "crawl" and max_age is not None and time.time() - record["completed_at"] > max_age * 3600:
+            return f"older than {max_age:g} hours"
+        return None
+
+    def plan(self, target="ingest"):
+        """{stage: reason} for the stages up to target that would run, in order.
+
+        A stale stage makes everything after it stale. With --offline the
+        crawl never runs, so later stages work from the pages already saved.
+        """
+        stages = STAGES[:STAGES.index(target) + 1]
+        fingerprints = self.fingerprints()
+        stale = {}
+        for stage in stages:
+            reason = self.why_stale(stage, fingerprints) or ("upstream changed" if stale else None)
+            if reason is None or (stage == "crawl" and self.args.offline):
+                continue
+            stale[stage] = reason
+        return stale
 
+    def run(self, target="ingest"):
+        stale = self.plan(target)
+        if not stale:
+            print(f"Everything up to '{target}' is up to date.")
+            return
+        print("Running: " + " -> ".join(f"{stage} ({reason})" for stage, reason in stale.items()))
+        if "crawl" in stale:
+            self.crawl()
+        elif "chunk" in stale:
+            self.chunk()
+        if "ingest" in stale:
+            # A recrawl or re-chunk can leave the corpus byte-for-byte the same
+            if self.why_stale("ingest", self.fingerprints()) is None:
+                print("Chunk file unchanged, skipping ingest")
+            else:
+                self.ingest()
+
+    def crawl(self):
+        """Crawl and chunk in one streaming pass, then record both stages."""
+        start = time.perf_counter()
+        asyncio.run(scraper.main(
+            output_path=CHUNKS_FILE, pages_path=PAGES_FILE, cache_path=CRAWL_CACHE,
+            use_sitemap=self.args.sitemap, extractor=self.args.extractor, max_tokens=self.args.max_tokens,
+            chunk_size=self.args.chunk_size, chunk_overlap=self.args.chunk_overlap, dedup=self.args.dedup,
+            max_concurrent=self.args.max_concurrent, requests_per_second=self.args.requests_per_second,
+            parse_workers=self.args.parse_workers,
+        ))
+        self.state.record("crawl", fingerprint(self.crawl_config()), [PAGES_FILE],
+                          pages_hash=file_hash(PAGES_FILE), seconds=time.perf_counter() - start)
+        self._record_chunk(time.perf_counter() - start)
+
+    def chunk(self):
+        """Re-chunk the saved pages (or the crawl cache) without fetching anything."""
+        start = time.perf_counter()
+        if os.path.exists(PAGES_FILE):
+            pages = PAGES_FILE
+        elif os.path.exists(CRAWL_CACHE):
+            print(f"{PAGES_FILE} not found, chunking the pages in {CRAWL_CACHE}")
+            pages = CrawlCache(CRAWL_CACHE).iter_pages()
+        else:
+            sys.exit("No crawled pages to chunk: run 'python main.py crawl' first")
+        scraper.rechunk(pages, CHUNKS_FILE, **self.chunk_config())
+        self._record_chunk(time.perf_counter() - start)
+
+    def _record_chunk(self, seconds):
+        self.state.record("chunk", self.fingerprints()["chunk"], [CHUNKS_FILE],
+                          corpus_hash=file_hash(CHUNKS_FILE), seconds=seconds)
+
+    def ingest(self):
+        """Embed the chunk file; incrementally unless the embedding or index config changed."""
+        start = time.perf_counter()
+        config = self.ingest_config()
+        previous = (self.state.get("ingest") or {}).get("config")
+        rebuild = "ingest" in self.args.force or (previous is not None and previous != config)
+        if rebuild:
+            print("Rebuilding the collection")
+        load_data(CHUNKS_FILE, incremental=not rebuild, db_path=self.args.db_path, pipelined=self.args.pipelined)
+        self.state.record("ingest", self.fingerprints()["ingest"], [self.args.db_path],
+                          config=config, seconds=time.perf_counter() - start)
+
+    def status(self):
+        stale = self.plan()
+        for stage in STAGES:
+            record = self.state.get(stage)
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(record["completed_at"])) if record else "-"
+            print(f"{stage:<8} {stale.get(stage, 'up to date'):<28} last run {when}")
+
+
+def chatbot():
     print("Stirling University Chatbot (type 'exit' to quit)")
     print("-" * 50)
 
@@ -41,15 +210,77 @@ def chatbot():
         if not user_query.strip():
             continue
 
-        context = search(user_query)
-        response = chat(user_query, context, LLM_MODEL, system_prompt)
-        print(response)
+        start = time.perf_counter()
+        cached = get_answer_cache().lookup(user_query) if ANSWER_CACHE else None
+        if cached:
+            print(cached['answer'])
+            print(f"\nSources: {', '.join(cached['sources'])}")
+            print(f"\n(cached answer, similarity {cached['similarity']:.2f}, "
+                  f"{(time.perf_counter() - start) * 1000:.0f} ms)")
+            continue
+
+        hits = search_hits(user_query, mode=SEARCH_MODE, rerank=RERANK, token_budget=CONTEXT_TOKEN_BUDGET)
+        search_seconds = time.perf_counter() - start
+        stream = chat_stream(user_query, format_context(hits), LLM_MODEL, SYSTEM_PROMPT)
+        for token in stream:
+            print(token, end="", flush=True)
+        stats = stream.stats
+        print(f"\n\n(search {search_seconds * 1000:.0f} ms, LLM {stats.total_time:.2f}s: "
+              f"first token {stats.time_to_first_token or 0:.2f}s, {stats.tokens_per_sec:.1f} tokens/s)")
+        if ANSWER_CACHE:
+            sources = dict.fromkeys(hit['url'] for hit in hits)
+            get_answer_cache().store(user_query, stream.answer, sources,
+                                     generation_seconds=time.perf_counter() - start)
+            print(f"Answer cache: {get_answer_cache().stats()}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stage_options = argparse.ArgumentParser(add_help=False)
+    stage_options.add_argument("--force", nargs="+", default=[], choices=STAGES,
+                               help="rerun these stages (and everything after them) even if up to date")
+    stage_options.add_argument("--offline", action="store_true",
+                               help="never crawl; chunk from the saved pages or the crawl cache")
+    stage_options.add_argument("--crawl-max-age", type=float,
+                               help="recrawl (incrementally) once the last crawl is this many hours old")
+    stage_options.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    stage_options.add_argument("--max-tokens", type=int, default=MAX_TOKENS,
+                               help="token-based chunks of at most this many tokens instead of --chunk-size")
+    stage_options.add_argument("--chunk-overlap", type=int, default=CHUNK_OVERLAP)
+    stage_options.add_argument("--dedup", action=argparse.BooleanOptionalAction, default=True)
+    stage_options.add_argument("--sitemap", action=argparse.BooleanOptionalAction, default=True,
+                               help="seed the crawl from sitemap.xml")
+    stage_options.add_argument("--extractor", help="HTML extractor: bs4, lxml or selectolax")
+    stage_options.add_argument("--max-concurrent", type=int, default=10, help="crawl fetches in flight at once")
+    stage_options.add_argument("--requests-per-second", type=float, default=5.0,
+                               help="per-host crawl rate (a robots.txt Crawl-delay overrides it)")
+    stage_options.add_argument("--parse-workers", type=int, default=0,
+                               help="processes parsing HTML during the crawl (0 parses on the event loop)")
+    stage_options.add_argument("--pipelined", action=argparse.BooleanOptionalAction, default=True,
+                               help="overlap parsing, embedding and writes during ingest")
+    stage_options.add_argument("--db-path", default=DB_PATH)
+    stage_options.add_argument("--state", default="pipeline_state.json", help="stage fingerprint file")
 
+    commands.add_parser("run", parents=[stage_options], help="bring every stage up to date")
+    for stage in STAGES:
+        commands.add_parser(stage, parents=[stage_options], help=f"bring stages up to '{stage}' up to date")
+    commands.add_parser("status", parents=[stage_options], help="show which stages are up to date")
+    commands.add_parser("chat", help="interactive chatbot")
+    commands.add_parser("evaluate", help="RAGAS evaluation")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    #scrape()
-    #ingest()
-    #search("Library Opening times ")
-    #chatbot()
-    evaluate()
\ No newline at end of file
+    args = parse_args()
+    # STIRBOT_PROFILE=cprofile or pyinstrument profiles the run; STIRBOT_METRICS enables metrics
+    with metrics.profile(os.environ.get("STIRBOT_PROFILE"), os.environ.get("STIRBOT_PROFILE_OUTPUT")):
+        if args.command == "chat":
+            chatbot()
+        elif args.command == "evaluate":
+            evaluate()
+        elif args.command == "status":
+            Pipeline(args).status()
+        else:
+            Pipeline(args).run("ingest" if args.command == "run" else args.command)
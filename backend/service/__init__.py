@@ -0,0 +1,6 @@
+"""Async HTTP service exposing search and chat over the RAG pipeline."""
+
+from .app import create_app, ServiceConfig
+from .batcher import EmbeddingBatcher
+
+__all__ = ['create_app', 'ServiceConfig', 'EmbeddingBatcher']
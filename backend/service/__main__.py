@@ -0,0 +1,32 @@
+"""Run the RAG HTTP service: python -m service --port 8080"""
+import argparse
+
+from aiohttp import web
+
+from .app import create_app, ServiceConfig
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stirling University RAG HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db-path", default="./chroma_db")
+    parser.add_argument("--mode", default="hybrid", choices=["vector", "lexical", "hybrid"])
+    parser.add_argument("--rerank", action="store_true")
+    parser.add_argument("--model", default="Mistral")
+    parser.add_argument("--ollama-host", default=None)
+    parser.add_argument("--max-llm-calls", type=int, default=4)
+    parser.add_argument("--max-pending", type=int, default=32)
+    parser.add_argument("--no-answer-cache", action="store_true", help="always retrieve and generate")
+    args = parser.parse_args()
+
+    config = ServiceConfig(
+        db_path=args.db_path, mode=args.mode, rerank=args.rerank, model=args.model,
+        ollama_host=args.ollama_host, max_llm_calls=args.max_llm_calls, max_pending=args.max_pending,
+        answer_cache=not args.no_answer_cache,
+    )
+    web.run_app(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
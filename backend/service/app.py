@@ -0,0 +1,165 @@
+"""aiohttp application: POST /search, POST /chat (streamed), GET /stats, GET /metrics, GET /health.
+
+The vector store, embedding model and Ollama client are process-wide and
+reused across requests. Query embeddings from concurrent requests are
+micro-batched, and LLM calls are capped at max_llm_calls with at most
+max_pending more chats waiting; beyond that /chat answers 503 with
+Retry-After so clients back off instead of queueing without bound.
+Paraphrases of questions already answered are served from the semantic
+answer cache without retrieval or generation.
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+
+from aiohttp import web
+
+from llm_interface.llm import SYSTEM_PROMPT, achat_stream
+from utils import metrics
+from vector_db.answer_cache import get_answer_cache
+from vector_db.chroma_client import get_embedding_function
+from vector_db.query import embedding_cache, normalize_query, retrieve, format_context, cache_stats
+from .batcher import EmbeddingBatcher
+
+
+@dataclass
+class ServiceConfig:
+    db_path: str = "./chroma_db"
+    mode: str = "hybrid"
+    n_results: int = 5
+    rerank: bool = False
+    token_budget: int = 800
+    model: str = "Mistral"
+    ollama_host: str = None
+    max_llm_calls: int = 4
+    max_pending: int = 32
+    max_batch: int = 64
+    max_wait_ms: float = 5
+    answer_cache: bool = True
+
+
+class RagService:
+    def __init__(self, config):
+        self.config = config
+        self.batcher = EmbeddingBatcher(self._embed, config.max_batch, config.max_wait_ms)
+        self.llm_slots = asyncio.Semaphore(config.max_llm_calls)
+        self.inflight = 0
+        self.rejected = 0
+        self.answer_cache = get_answer_cache(config.db_path) if config.answer_cache else None
+
+    @staticmethod
+    def _embed(texts):
+        return get_embedding_function()(texts)
+
+    async def embed(self, query):
+        """Query embedding from the shared cache, or from the next micro-batch."""
+        key = normalize_query(query)
+        embedding = embedding_cache.get(key)
+        if embedding is None:
+            embedding = await self.batcher.embed(key)
+            embedding_cache.put(key, embedding)
+        return embedding
+
+    async def retrieve(self, query, n_results=None, mode=None, embedding=None):
+        """Embed (batched, cached) then retrieve off the event loop."""
+        config = self.config
+        mode = mode or config.mode
+        if embedding is None and mode != "lexical":
+            embedding = await self.embed(query)
+        loop = asyncio.get_running_loop()
+        if config.rerank:
+            from vector_db.rerank import rerank
+            candidates = await loop.run_in_executor(None, retrieve, query, 30, mode, config.db_path, embedding)
+            hits, _ = await loop.run_in_executor(
+                None, rerank, query, candidates, config.token_budget, n_results or config.n_results)
+            return hits
+        return await loop.run_in_executor(
+            None, retrieve, query, n_results or config.n_results, mode, config.db_path, embedding)
+
+    async def handle_search(self, request):
+        body = await request.json()
+        start = time.perf_counter()
+        hits = await self.retrieve(body["query"], body.get("n_results"), body.get("mode"))
+        return web.json_response({
+            "hits": hits,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+        })
+
+    async def handle_chat(self, request):
+        body = await request.json()
+        question = body["question"]
+        start = time.perf_counter()
+        embedding = None
+        if self.answer_cache is not None:
+            embedding = await self.embed(question)
+            cached = self.answer_cache.lookup(question, embedding)
+            if cached:
+                return web.Response(content_type="application/x-ndjson", body=(
+                    json.dumps({"token": cached["answer"]}) + "\n" +
+                    json.dumps({"done": True, "sources": cached["sources"], "cached": True,
+                                "similarity": cached["similarity"],
+                                "latency_ms": (time.perf_counter() - start) * 1000}) + "\n"
+                ).encode())
+
+        if self.inflight >= self.config.max_llm_calls + self.config.max_pending:
+            self.rejected += 1
+            metrics.inc("service_rejected_total")
+            return web.json_response({"error": "busy, retry later"}, status=503, headers={"Retry-After": "1"})
+
+        self.inflight += 1
+        try:
+            hits = await self.retrieve(question, body.get("n_results"), body.get("mode"), embedding)
+            retrieval_ms = (time.perf_counter() - start) * 1000
+
+            response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+            await response.prepare(request)
+            async with self.llm_slots:
+                stream = achat_stream(question, format_context(hits), self.config.model, SYSTEM_PROMPT,
+                                      self.config.ollama_host)
+                async for token in stream:
+                    await response.write(json.dumps({"token": token}).encode() + b"\n")
+        finally:
+            self.inflight -= 1
+
+        sources = list(dict.fromkeys(hit["url"] for hit in hits))
+        if self.answer_cache is not None:
+            self.answer_cache.store(question, stream.answer, sources, embedding,
+                                    generation_seconds=time.perf_counter() - start)
+        await response.write(json.dumps({
+            "done": True,
+            "sources": sources,
+            "cached": False,
+            "retrieval_ms": retrieval_ms,
+            "generation": stream.stats.as_dict(),
+        }).encode() + b"\n")
+        await response.write_eof()
+        return response
+
+    async def handle_stats(self, request):
+        return web.json_response({
+            "embedding_batcher": self.batcher.stats(),
+            "caches": cache_stats(),
+            "answer_cache": self.answer_cache.stats() if self.answer_cache is not None else None,
+            "chat_inflight": self.inflight,
+            "rejected": self.rejected,
+        })
+
+    async def handle_metrics(self, request):
+        """utils.metrics in Prometheus text format (empty unless STIRBOT_METRICS is set)."""
+        return web.Response(text=metrics.export_prometheus(), content_type="text/plain")
+
+    async def handle_health(self, request):
+        return web.json_response({"ok": True})
+
+
+def create_app(config=None):
+    service = RagService(config or ServiceConfig())
+    app = web.Application()
+    app["service"] = service
+    app.router.add_post("/search", service.handle_search)
+    app.router.add_post("/chat", service.handle_chat)
+    app.router.add_get("/stats", service.handle_stats)
+    app.router.add_get("/metrics", service.handle_metrics)
+    app.router.add_get("/health", service.handle_health)
+    return app
@@ -0,0 +1,64 @@
+import asyncio
+
+
+class EmbeddingBatcher:
+    """Micro-batches concurrent query embeddings into a single encode call.
+
+    Requests that arrive within max_wait_ms of each other (up to max_batch)
+    are embedded together in a worker thread, so N concurrent users cost
+    one model forward pass instead of N.
+    """
+
+    def __init__(self, embed_fn, max_batch=64, max_wait_ms=5):
+        self.embed_fn = embed_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.pending = []
+        self.flush_task = None
+        self.batches = 0
+        self.items = 0
+
+    async def embed(self, text):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((text, future))
+        if len(self.pending) >= self.max_batch:
+            self._flush_now()
+        elif self.flush_task is None:
+            self.flush_task = asyncio.create_task(self._flush_later())
+        return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.max_wait)
+        self.flush_task = None
+        await self._flush()
+
+    def _flush_now(self):
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+        texts = [text for text, _ in batch]
+        try:
+            embeddings = await asyncio.get_running_loop().run_in_executor(None, self.embed_fn, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.items += len(batch)
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'queries': self.items,
+            'avg_batch_size': self.items / self.batches if self.batches else 0.0,
+        }
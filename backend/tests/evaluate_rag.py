@@ -1,5 +1,18 @@
-"""RAG evaluation using RAGAS and Ollama."""
+"""RAG evaluation using RAGAS and Ollama.
+
+Answers are generated concurrently through the async Ollama client, with
+the chatbot's retrieval settings, and cached in results/eval_cache.db
+along with the RAGAS judgments (saved a slice at a time), so a rerun (or
+a run resumed after a failure) only evaluates questions whose answer or
+inputs changed.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import sqlite3
 import sys
+import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -7,41 +20,62 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from ragas import evaluate
 from ragas.metrics import faithfulness, answer_relevancy
 from ragas.llms.base import BaseRagasLLM, LLMResult
+from ragas.run_config import RunConfig
 from ragas.embeddings.base import Embeddings
 from datasets import Dataset
 from langchain_ollama import ChatOllama
 from langchain_core.messages import HumanMessage
 from langchain_core.outputs import Generation
 from sentence_transformers import SentenceTransformer
-from vector_db import search
-from llm_interface import chat
+from vector_db import search, search_hits
+from vector_db.cache import collection_version
+from vector_db.query import format_context
+from llm_interface import SYSTEM_PROMPT, chat_stream, achat_stream
+from utils.chunker import get_token_counter
+from utils.metrics import percentile
+from main import SEARCH_MODE, RERANK, CONTEXT_TOKEN_BUDGET
 from .test_data import get_test_dataset
 
 ## RAG Evaluation Script thingy RAGAS + Ollama + Sentence Transformers
 
+RESULTS_DIR = Path(__file__).parent / "results"
+ANSWER_MODEL = "Mistral"
+JUDGE_MODEL = "mistral"
+METRICS = ["faithfulness", "answer_relevancy"]
+# Questions judged per RAGAS call; judgments are cached after each slice
+JUDGE_BATCH = 8
+
 
 class OllamaRagasLLM(BaseRagasLLM):
     """Wrapper to make ChatOllama compatible with RAGAS."""
 
-    def __init__(self, model_name: str = "mistral"):
+    def __init__(self, model_name: str = "mistral", max_concurrency: int = 4):
         super().__init__()
         self.llm = ChatOllama(model=model_name, temperature=0, timeout=30.0)
+        self.max_concurrency = max_concurrency
+        self._slots = None
 
-    def generate_text(self, prompt, **kwargs) -> LLMResult:
-        """Generate text using Ollama."""
+    @staticmethod
+    def _messages(prompt):
         # Handle StringPromptValue objects from RAGAS
         if hasattr(prompt, 'text'):
             prompt_text = prompt.text
         else:
             prompt_text = str(prompt)
+        return [HumanMessage(content=prompt_text)]
 
-        messages = [HumanMessage(content=prompt_text)]
-        response = self.llm.invoke(messages)
+    def generate_text(self, prompt, **kwargs) -> LLMResult:
+        """Generate text using Ollama."""
+        response = self.llm.invoke(self._messages(prompt))
         return LLMResult(generations=[[Generation(text=response.content)]])
 
     async def agenerate_text(self, prompt, **kwargs) -> LLMResult:
-        """Async generate text using Ollama."""
-        return self.generate_text(prompt, **kwargs)
+        """Async generate text using Ollama, at most max_concurrency requests at a time."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        async with self._slots:
+            response = await self.llm.ainvoke(self._messages(prompt))
+        return LLMResult(generations=[[Generation(text=response.content)]])
 
     def is_finished(self, response):
         """Check if generation is finished."""
@@ -63,27 +97,125 @@ class SentenceTransformerEmbeddings(Embeddings):
        
         return self.model.encode(documents, convert_to_numpy=True)
 
-def get_rag_response(question: str, n_results: int = 5):
+def get_rag_response(question: str, n_results: int = 5, stats: dict = None):
     """
     Get RAG response from the chatbot.
     ##
+    Pass a dict as stats to receive time to first token and tokens/sec.
+
     Returns:
         tuple: (answer, context_list)
     """
     try:
-        context = search(question, n_results=n_results)
-        system_prompt = (
-            "You are a helpful chatbot that returns relevant appropriate answers "
-            "for people interested in knowing more about Stirling University. "
-            "Give Citations about where you got your answers from."
-        )
-        response = chat(question, context, "Mistral", system_prompt)
+        context = search(question, n_results=n_results, mode=SEARCH_MODE, rerank=RERANK,
+                         token_budget=CONTEXT_TOKEN_BUDGET)
+        stream = chat_stream(question, context, ANSWER_MODEL, SYSTEM_PROMPT)
+        response = "".join(stream)
+        if stats is not None:
+            stats.update(stream.stats.as_dict())
         return response, context
     except Exception as e:
         print(f"Error getting response for '{question}': {e}")
         return "", ""
 
-def run_evaluation():
+class EvalCache:
+    """SQLite store of generated answers and RAGAS scores, committed per question."""
+
+    def __init__(self, path=RESULTS_DIR / "eval_cache.db"):
+        Path(path).parent.mkdir(exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+
+    @staticmethod
+    def key(*parts):
+        return hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def get(self, table, key):
+        row = self.conn.execute(f"SELECT value FROM {table} WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, table, key, value):
+        self.conn.execute(f"INSERT OR REPLACE INTO {table} (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+async def aget_rag_response(question: str, n_results: int = 5, model: str = ANSWER_MODEL):
+    """
+    Async RAG response with per-stage timing.
+
+    Retrieval uses the chatbot's search mode, reranking and context budget
+    (main.SEARCH_MODE, RERANK, CONTEXT_TOKEN_BUDGET) and runs in a worker
+    thread; generation streams from the async Ollama client. Returns a dict with answer, context, retrieval_ms,
+    context_tokens and generation stats, or None if the question failed.
+    """
+    try:
+        start = time.perf_counter()
+        hits = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: search_hits(question, n_results, mode=SEARCH_MODE, rerank=RERANK,
+                                      token_budget=CONTEXT_TOKEN_BUDGET)
+        )
+        retrieval_ms = (time.perf_counter() - start) * 1000
+        context = format_context(hits)
+
+        stream = achat_stream(question, context, model, SYSTEM_PROMPT)
+        async for _ in stream:
+            pass
+        generation = stream.stats.as_dict()
+        return {
+            "answer": stream.answer,
+            "context": context,
+            "retrieval_ms": retrieval_ms,
+            "generation_ms": generation["total_time"] * 1000,
+            "context_tokens": get_token_counter()([context])[0],
+            "generation": generation,
+        }
+    except Exception as e:
+        print(f"Error getting response for '{question}': {e}")
+        return None
+
+
+async def generate_responses(questions, cache, max_concurrency=4, n_results=5, refresh=False):
+    """Answer every question, at most max_concurrency at once, reusing cached answers.
+
+    An answer is reused while the question, retrieval settings, model and
+    collection version are unchanged.
+    """
+    slots = asyncio.Semaphore(max_concurrency)
+    version = collection_version()
+    done = 0
+
+    async def answer(question):
+        nonlocal done
+        key = cache.key(question, n_results, SEARCH_MODE, RERANK, CONTEXT_TOKEN_BUDGET, ANSWER_MODEL,
+                        SYSTEM_PROMPT, version)
+        response = None if refresh else cache.get("answers", key)
+        if response is None:
+            async with slots:
+                response = await aget_rag_response(question, n_results)
+            if response is not None:
+                cache.put("answers", key, response)
+        done += 1
+        print(f"  [{done}/{len(questions)}] {question[:40]}..." + ("" if response else " FAILED"))
+        return response
+
+    return await asyncio.gather(*(answer(q) for q in questions))
+
+
+def _score(value):
+    """Per-question metric value as a float, or None for NaN/missing."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def run_evaluation(max_concurrency=4, judge_concurrency=4, refresh=False, judge_batch=JUDGE_BATCH):
     """Run RAGAS evaluation on the test dataset."""
     print("=" * 60)
     print("RAG Evaluation - Stirling University Chatbot")
@@ -93,59 +225,72 @@ def run_evaluation():
     test_dataset = get_test_dataset()
     print(f"Loaded {len(test_dataset)} questions\n")
 
-    print("Generating RAG responses...")
-    results = {
-        "question": [],
-        "answer": [],
-        "contexts": [],
-        "ground_truth": []
-    }
-    #
-    for idx, (question, ground_truth) in enumerate(
-        zip(test_dataset["question"], test_dataset["ground_truth"]), 1
-    ):
-        print(f"  [{idx}/{len(test_dataset)}] {question[:40]}...")
-        answer, context = get_rag_response(question)
-
-        results["question"].append(question)
-        results["answer"].append(answer)
-        results["contexts"].append([context])
-        results["ground_truth"].append(ground_truth)
-
-    eval_dataset = Dataset.from_dict(results)
-
-    print("\nRunning evaluation metrics...")
-    ollama_llm = OllamaRagasLLM(model_name="mistral")
-    embeddings = SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
-
-    ragas_results = evaluate(
-        eval_dataset,
-        metrics=[
-            faithfulness,
-            answer_relevancy,
-        ],
-        llm=ollama_llm,
-        embeddings=embeddings,
-    )
+    print(f"Generating RAG responses ({max_concurrency} concurrent)...")
+    cache = EvalCache()
+    questions = list(test_dataset["question"])
+    ground_truths = list(test_dataset["ground_truth"])
+    start = time.perf_counter()
+    responses = asyncio.run(generate_responses(questions, cache, max_concurrency, refresh=refresh))
+    print(f"Generated {len(questions)} responses in {time.perf_counter() - start:.1f}s")
+
+    # Only questions whose (question, answer, context, ground truth) changed are judged again
+    cases = []
+    pending = []
+    for question, ground_truth, response in zip(questions, ground_truths, responses):
+        response = response or {"answer": "", "context": ""}
+        key = cache.key(question, response["answer"], response["context"], ground_truth, JUDGE_MODEL, METRICS)
+        scores = None if refresh or not response["answer"] else cache.get("scores", key)
+        case = {"question": question, "ground_truth": ground_truth, "response": response,
+                "key": key, "scores": scores}
+        cases.append(case)
+        if scores is None and response["answer"]:
+            pending.append(case)
+
+    if pending:
+        print(f"\nRunning evaluation metrics on {len(pending)} of {len(cases)} questions...")
+        ollama_llm = OllamaRagasLLM(model_name=JUDGE_MODEL, max_concurrency=judge_concurrency)
+        embeddings = SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
+
+        # Judged a slice at a time so an interruption only loses the current slice
+        for i in range(0, len(pending), judge_batch):
+            batch = pending[i:i + judge_batch]
+            eval_dataset = Dataset.from_dict({
+                "question": [c["question"] for c in batch],
+                "answer": [c["response"]["answer"] for c in batch],
+                "contexts": [[c["response"]["context"]] for c in batch],
+                "ground_truth": [c["ground_truth"] for c in batch],
+            })
+            ragas_results = evaluate(
+                eval_dataset,
+                metrics=[
+                    faithfulness,
+                    answer_relevancy,
+                ],
+                llm=ollama_llm,
+                embeddings=embeddings,
+                run_config=RunConfig(max_workers=judge_concurrency),
+            )
+            for case, row in zip(batch, ragas_results.scores):
+                case["scores"] = {name: _score(row.get(name)) for name in METRICS}
+                if all(v is not None for v in case["scores"].values()):
+                    cache.put("scores", case["key"], case["scores"])
+            print(f"  Judged {min(i + judge_batch, len(pending))}/{len(pending)}")
+    else:
+        print("\nAll judgments cached, skipping RAGAS")
+    cache.close()
 
     # Display results
     print("\n" + "=" * 60)
     print("EVALUATION RESULTS")
     print("=" * 60)
 
-    # Handle both scalar and list results from RAGAS
-    def get_scalar_score(value):
-        """Extract scalar from value, handling lists and numpy arrays."""
-        if isinstance(value, list):
-            return sum(value) / len(value) if value else 0
-        try:
-            return float(value)
-        except (TypeError, ValueError):
-            return 0.0
+    def mean(name):
+        values = [c["scores"][name] for c in cases if c["scores"] and c["scores"][name] is not None]
+        return sum(values) / len(values) if values else 0.0
 
     metrics = {
-        "Faithfulness": get_scalar_score(ragas_results["faithfulness"]),
-        "Answer Relevancy": get_scalar_score(ragas_results["answer_relevancy"]),
+        "Faithfulness": mean("faithfulness"),
+        "Answer Relevancy": mean("answer_relevancy"),
     }
 
     for metric_name, score in metrics.items():
@@ -158,21 +303,39 @@ def run_evaluation():
     print(f"{'Overall Score':20s}: {overall_score:.4f} ({overall_score*100:.2f}%)")
     print("=" * 60)
 
+    answered = [c["response"] for c in cases if c["response"]["answer"]]
+    timing = {
+        f"{stage}_{p}": percentile([r[f"{stage}_ms"] for r in answered], int(p[1:]))
+        for stage in ("retrieval", "generation") for p in ("p50", "p95")
+    }
+    timing["mean_context_tokens"] = (
+        sum(r["context_tokens"] for r in answered) / len(answered) if answered else 0.0
+    )
+    print(f"Retrieval ms p50/p95: {timing['retrieval_p50']:.0f}/{timing['retrieval_p95']:.0f}, "
+          f"generation ms p50/p95: {timing['generation_p50']:.0f}/{timing['generation_p95']:.0f}, "
+          f"mean context tokens: {timing['mean_context_tokens']:.0f}")
+
     # Save results
-    results_dir = Path(__file__).parent / "results"
+    results_dir = RESULTS_DIR
     results_dir.mkdir(exist_ok=True)
 
-    import json
     details = {
         "metrics_summary": metrics,
         "overall_score": overall_score,
+        "timing": timing,
         "test_cases": [
-            {"question": q, "answer": a, "ground_truth": gt}
-            for q, a, gt in zip(
-                results["question"],
-                results["answer"],
-                results["ground_truth"]
-            )
+            {
+                "question": c["question"],
+                "answer": c["response"]["answer"],
+                "ground_truth": c["ground_truth"],
+                "faithfulness": (c["scores"] or {}).get("faithfulness"),
+                "answer_relevancy": (c["scores"] or {}).get("answer_relevancy"),
+                "retrieval_ms": c["response"].get("retrieval_ms"),
+                "generation_ms": c["response"].get("generation_ms"),
+                "context_tokens": c["response"].get("context_tokens"),
+                "generation": c["response"].get("generation"),
+            }
+            for c in cases
         ]
     }
     json_path = results_dir / "results.json"
@@ -184,7 +347,14 @@ def run_evaluation():
     print("  Faithfulness: answers grounded in context (higher = better)")
     print("  Answer Relevancy: answers address the question (higher = better)")
 
-    return ragas_results
+    return details
 
 if __name__ == "__main__":
-    run_evaluation()
+    import argparse
+    parser = argparse.ArgumentParser(description="RAGAS evaluation of the Stirling University chatbot")
+    parser.add_argument("--concurrency", type=int, default=4, help="answers generated at once")
+    parser.add_argument("--judge-concurrency", type=int, default=4, help="RAGAS judge calls at once")
+    parser.add_argument("--refresh", action="store_true", help="ignore cached answers and judgments")
+    parser.add_argument("--judge-batch", type=int, default=JUDGE_BATCH, help="questions judged per RAGAS call")
+    args = parser.parse_args()
+    run_evaluation(args.concurrency, args.judge_concurrency, args.refresh, args.judge_batch)
@@ -2,7 +2,6 @@
 Test dataset for RAGAS evaluation of the Stirling University RAG chatbot.
 Ground truth answers sourced directly from Stirling University website.
 """
-from datasets import Dataset
 
 # Comprehensive test cases with real ground truth from Stirling University website
 test_qa_pairs = {
@@ -32,10 +31,33 @@ test_qa_pairs = {
     ]
 }
 
+# Pages each ground truth was taken from, aligned with test_qa_pairs["question"].
+# A retrieved chunk counts as relevant when its URL starts with one of these.
+target_urls = [
+    ["https://www.stir.ac.uk/study/undergraduate/fees-and-funding/",
+     "https://www.stir.ac.uk/international/"],
+    ["https://www.stir.ac.uk/student-life/accommodation/"],
+    ["https://www.stir.ac.uk/about/"],
+    ["https://www.stir.ac.uk/about/"],
+    ["https://www.stir.ac.uk/student-life/accommodation/"],
+    ["https://www.stir.ac.uk/student-life/accommodation/"],
+    ["https://www.stir.ac.uk/student-life/accommodation/"],
+    ["https://www.stir.ac.uk/student-life/accommodation/"],
+    ["https://www.stir.ac.uk/student-life/", "https://www.stir.ac.uk/about/"],
+    ["https://www.stir.ac.uk/about/", "https://www.stir.ac.uk/international/"],
+]
+
+
 def get_test_dataset():
     """Return the test dataset as a Hugging Face Dataset object."""
+    from datasets import Dataset
     return Dataset.from_dict(test_qa_pairs)
 
+
+def get_retrieval_cases():
+    """Return [(question, ground_truth, target_urls), ...] for retrieval benchmarks."""
+    return list(zip(test_qa_pairs["question"], test_qa_pairs["ground_truth"], target_urls))
+
 if __name__ == "__main__":
     dataset = get_test_dataset()
     print(f"Loaded test dataset with {len(dataset)} QA pairs")
@@ -1,5 +1,9 @@
 """Utility modules for backend processing."""
 
-from .chunker import chunk_text, chunk_scraped_data
+from .chunker import chunk_text, chunk_scraped_data, iter_token_chunks, chunk_page_tokens, get_token_counter
+from .records import RecordWriter, iter_records, iter_record_batches
+from .dedup import Deduplicator
 
-__all__ = ['chunk_text', 'chunk_scraped_data']
+__all__ = [
+    'chunk_text', 'chunk_scraped_data', 'iter_token_chunks', 'chunk_page_tokens', 'get_token_counter',
+    'RecordWriter', 'iter_records', 'iter_record_batches', 'Deduplicator']
@@ -1,3 +1,7 @@
+import re
+from functools import lru_cache
+
+
 def chunk_text(text, size=1000):
     chunks = []
     for i in range(0, len(text), size):
@@ -18,3 +22,196 @@ def chunk_scraped_data(scraped_data, chunk_size=1000):
                 'text': chunk
             })
     return all_chunks
+
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'(£$])')
+
+
+def approx_token_counts(texts):
+    """Cheap token estimate (words plus common punctuation) when no tokenizer is available."""
+    return [len(t.split()) + t.count(',') + t.count('.') + t.count('(') for t in texts]
+
+
+def _sentences(block):
+    # Most blocks are a single sentence or a short label; skip the regex for those
+    if '. ' not in block and '? ' not in block and '! ' not in block:
+        return [block]
+    return _SENTENCE_END.split(block)
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(model_name="sentence-transformers/all-MiniLM-L6-v2"):
+    """Return a batch token counter using the embedding model's tokenizer.
+
+    The returned callable takes a list of strings and returns their token
+    counts from one batched (Rust) tokenizer call. Falls back to
+    approx_token_counts if transformers or the model files are unavailable.
+    """
+    try:
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+    except Exception as e:
+        print(f"Tokenizer for {model_name} unavailable ({e}), using approximate token counts")
+        return approx_token_counts
+
+    def count(texts):
+        if not texts:
+            return []
+        encoded = tokenizer(texts, add_special_tokens=False, return_attention_mask=False,
+                            return_token_type_ids=False)
+        return [len(ids) for ids in encoded['input_ids']]
+
+    return count
+
+
+def _page_units(page):
+    """Split a page into (kind, text) units: 'heading' blocks and 'sentence's.
+
+    A ('para', '') marker separates paragraphs so the packer can prefer
+    breaking between them.
+    """
+    headings = set(page.get('headings') or [])
+    units = []
+    for block in page.get('text', '').split('\n'):
+        block = block.strip()
+        if not block:
+            continue
+        if block in headings:
+            units.append(('heading', block))
+            continue
+        units.append(('para', ''))
+        units.extend(('sentence', s) for s in _sentences(block) if s)
+    return units
+
+
+def _split_long(text, tokens, max_tokens):
+    """Split a single over-budget sentence into word windows of roughly max_tokens."""
+    words = text.split()
+    per_word = max(tokens / max(len(words), 1), 1e-6)
+    step = max(int(max_tokens / per_word), 1)
+    return [(' '.join(words[i:i + step]), min(tokens, int(step * per_word) + 1))
+            for i in range(0, len(words), step)]
+
+
+def _pack_page(units, counts, max_tokens, overlap, min_tokens):
+    """Greedily pack sentences into chunks of at most max_tokens.
+
+    Chunks break at headings (once they hold min_tokens), before a paragraph
+    that would overflow, and otherwise between sentences. When a break falls
+    mid-section, up to `overlap` tokens of trailing sentences are repeated at
+    the start of the next chunk, and every chunk is prefixed with its section
+    heading for context, truncated to half of max_tokens if longer.
+    """
+    chunks = []
+    current = []          # [(text, tokens)]
+    current_tokens = 0
+    heading = None
+    heading_tokens = 0
+
+    def emit(carry_overlap):
+        nonlocal current, current_tokens
+        if not current:
+            return
+        body = ' '.join(t for t, _ in current)
+        chunks.append(f"{heading}\n{body}" if heading else body)
+        carried = []
+        if carry_overlap and overlap:
+            kept = 0
+            for text, tokens in reversed(current):
+                if kept + tokens > overlap:
+                    break
+                carried.insert(0, (text, tokens))
+                kept += tokens
+        current = carried
+        current_tokens = sum(t for _, t in carried)
+
+    # Token count of each paragraph, so a whole paragraph can be tested for fit
+    para_tokens = []
+    total = 0
+    for (kind, _), n in zip(reversed(units), reversed(counts)):
+        if kind == 'sentence':
+            total += n
+        elif kind == 'para':
+            para_tokens.append(total)
+            total = 0
+        else:
+            total = 0
+    para_tokens.reverse()
+    para_index = 0
+
+    for (kind, text), tokens in zip(units, counts):
+        if kind == 'heading':
+            if current_tokens >= min_tokens:
+                emit(carry_overlap=False)
+                current = []
+                current_tokens = 0
+            heading, heading_tokens = text, tokens
+            if heading_tokens > max_tokens // 2:
+                # Cap the heading prefix at half the chunk so the body keeps a positive budget
+                if max_tokens >= 2:
+                    heading = _split_long(text, tokens, max_tokens // 2)[0][0]
+                    heading_tokens = max_tokens // 2
+                else:
+                    heading, heading_tokens = None, 0
+            continue
+        budget = max_tokens - heading_tokens
+        if kind == 'para':
+            size = para_tokens[para_index]
+            para_index += 1
+            if current and current_tokens + size > budget and size <= budget:
+                emit(carry_overlap=True)
+            continue
+        pieces = _split_long(text, tokens, budget) if tokens > budget else [(text, tokens)]
+        for piece, piece_tokens in pieces:
+            if current and current_tokens + piece_tokens > budget:
+                emit(carry_overlap=True)
+                # Drop carried overlap that would leave no room for this piece
+                while current and current_tokens + piece_tokens > budget:
+                    current_tokens -= current.pop(0)[1]
+            current.append((piece, piece_tokens))
+            current_tokens += piece_tokens
+    emit(carry_overlap=False)
+    return chunks
+
+
+def iter_token_chunks(pages, max_tokens=250, overlap=32, count_tokens=None, batch_pages=64):
+    """Yield chunk records for a stream of pages, splitting on structure.
+
+    Splits on heading, paragraph and sentence boundaries and packs the
+    pieces into chunks of at most max_tokens tokens as measured by
+    count_tokens (default: the embedding model's tokenizer), with `overlap`
+    tokens repeated between consecutive chunks of a section. Pages are
+    tokenized batch_pages at a time in a single tokenizer call; records have
+    the same shape as chunk_scraped_data's.
+    """
+    count_tokens = count_tokens or get_token_counter()
+    min_tokens = max_tokens // 4
+
+    def flush(buffer):
+        units = [_page_units(page) for page in buffer]
+        headings = [[text for kind, text in page_units if kind != 'para'] for page_units in units]
+        flat = [text for page_texts in headings for text in page_texts]
+        flat_counts = iter(count_tokens(flat))
+        for page, page_units in zip(buffer, units):
+            counts = [0 if kind == 'para' else next(flat_counts) for kind, _ in page_units]
+            for i, chunk in enumerate(_pack_page(page_units, counts, max_tokens, overlap, min_tokens)):
+                yield {
+                    'url': page.get('url', ''),
+                    'title': page.get('title', ''),
+                    'chunk_index': i,
+                    'text': chunk
+                }
+
+    buffer = []
+    for page in pages:
+        buffer.append(page)
+        if len(buffer) >= batch_pages:
+            yield from flush(buffer)
+            buffer = []
+    if buffer:
+        yield from flush(buffer)
+
+
+def chunk_page_tokens(page, max_tokens=250, overlap=32, count_tokens=None):
+    """Chunk a single page with iter_token_chunks."""
+    return list(iter_token_chunks([page], max_tokens, overlap, count_tokens, batch_pages=1))
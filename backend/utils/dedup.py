@@ -0,0 +1,183 @@
+"""Boilerplate and near-duplicate page removal between scraping and chunking.
+
+Works on the line-per-block page text produced by the scraper and runs as a
+streaming stage: pages are filtered one at a time as the crawl produces them.
+"""
+import hashlib
+
+import numpy as np
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def simhash(text, shingle_size=3):
+    """64-bit SimHash of a text over word shingles."""
+    words = text.lower().split()
+    if len(words) < shingle_size:
+        shingles = [' '.join(words)]
+    else:
+        shingles = [' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    hashes = np.array([_hash64(s) for s in shingles], dtype=np.uint64)
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    votes = bits.sum(axis=0) * 2 > len(shingles)
+    return int(np.packbits(votes[::-1]).view('>u8')[0])
+
+
+class BoilerplateFilter:
+    """Drop text blocks (lines) that repeat across most of the site.
+
+    A block is counted under two keys, its text paired with the line before
+    it and with the line after it (the page start and end count as lines),
+    and is boilerplate when either pair has appeared on at least min_pages
+    pages and at least min_fraction of the pages seen. Every line of a
+    repeated menu, footer or cookie banner, including the first and last,
+    has a neighbour in the same run, so the whole run matches; a short fact
+    such as "Duration: 4 years" between page-specific lines does not.
+
+    Lines the page lists as headings are never removed, since the chunker
+    relies on them. Blocks longer than max_block_chars are assumed to be
+    content and are not tracked. Once more than max_tracked keys are
+    counted, keys seen on a single page are forgotten.
+    """
+
+    def __init__(self, min_pages=10, min_fraction=0.5, max_block_chars=300, max_tracked=500_000):
+        self.min_pages = min_pages
+        self.min_fraction = min_fraction
+        self.max_block_chars = max_block_chars
+        self.max_tracked = max_tracked
+        self.page_counts = {}
+        self.pages_seen = 0
+        self.blocks_dropped = 0
+
+    def _keys(self, text, headings):
+        """(block, (key before, key after) or None if never boilerplate) for each line."""
+        blocks = text.split('\n')
+        lines = ['\0start', *(block.lower() for block in blocks), '\0end']
+        pair_keys = [_hash64(f"{a}\0{b}") for a, b in zip(lines, lines[1:])]
+        return [
+            (block, None if len(block) > self.max_block_chars or block in headings else pair_keys[i:i + 2])
+            for i, block in enumerate(blocks)
+        ]
+
+    def count(self, text, headings=()):
+        """Count a page's blocks without filtering it."""
+        self.pages_seen += 1
+        keys = {key for _, pair in self._keys(text, set(headings)) if pair for key in pair}
+        for key in keys:
+            self.page_counts[key] = self.page_counts.get(key, 0) + 1
+        if len(self.page_counts) > self.max_tracked:
+            self.page_counts = {key: n for key, n in self.page_counts.items() if n > 1}
+
+    def strip(self, text, headings=()):
+        """Text with the blocks counted as boilerplate so far removed."""
+        threshold = max(self.min_pages, self.min_fraction * self.pages_seen)
+        kept = []
+        for block, pair in self._keys(text, set(headings)):
+            if pair and max(self.page_counts.get(key, 0) for key in pair) >= threshold:
+                self.blocks_dropped += 1
+                continue
+            kept.append(block)
+        return '\n'.join(kept)
+
+    def filter(self, text, headings=()):
+        """Count a page's blocks, then return it with boilerplate removed."""
+        self.count(text, headings)
+        return self.strip(text, headings)
+
+
+class NearDuplicateIndex:
+    """SimHash index that finds pages within max_distance bits of a seen page.
+
+    The 64-bit hash is split into four 16-bit bands; any page within 3 bits
+    of another shares at least one band exactly, so only pages in matching
+    band buckets are compared.
+    """
+
+    def __init__(self, max_distance=3):
+        self.max_distance = max_distance
+        self.bands = [{} for _ in range(4)]
+
+    def find_or_add(self, fingerprint, url):
+        """Return the URL of a near-duplicate page, or record this one and return None."""
+        keys = [(fingerprint >> (16 * i)) & 0xFFFF for i in range(4)]
+        for band, key in zip(self.bands, keys):
+            for other, other_url in band.get(key, ()):
+                if bin(fingerprint ^ other).count('1') <= self.max_distance:
+                    return other_url
+        for band, key in zip(self.bands, keys):
+            band.setdefault(key, []).append((fingerprint, url))
+        return None
+
+
+class Deduplicator:
+    """Streaming dedup stage: strips boilerplate, then collapses near-duplicate pages.
+
+    The first warmup_pages pages are only counted and held back, then
+    released together, so the pages crawled first (the homepage and hub
+    pages) are filtered with the same counts as the rest. add() returns the
+    pages that are ready; call flush() after the last page.
+    """
+
+    def __init__(self, min_pages=10, min_fraction=0.5, max_distance=3, warmup_pages=None):
+        self.boilerplate = BoilerplateFilter(min_pages=min_pages, min_fraction=min_fraction)
+        self.near_duplicates = NearDuplicateIndex(max_distance=max_distance)
+        self.warmup_pages = 2 * min_pages if warmup_pages is None else warmup_pages
+        self.held = []
+        self.pages_in = 0
+        self.pages_collapsed = 0
+        self.chars_in = 0
+        self.chars_out = 0
+
+    @property
+    def holding(self):
+        return len(self.held)
+
+    def add(self, page):
+        """Pages (boilerplate removed, near-duplicates dropped) ready after adding page."""
+        self.pages_in += 1
+        self.boilerplate.count(page.get('text', ''), page.get('headings') or ())
+        if self.boilerplate.pages_seen <= self.warmup_pages:
+            self.held.append(page)
+            return self.flush() if self.boilerplate.pages_seen == self.warmup_pages else []
+        return self._release([page])
+
+    def flush(self):
+        """Release the pages still held back."""
+        pages, self.held = self.held, []
+        return self._release(pages)
+
+    def _release(self, pages):
+        released = []
+        for page in pages:
+            text = page.get('text', '')
+            self.chars_in += len(text)
+            text = self.boilerplate.strip(text, page.get('headings') or ())
+            if not text.strip():
+                self.pages_collapsed += 1
+                continue
+            if self.near_duplicates.find_or_add(simhash(text), page.get('url', '')):
+                self.pages_collapsed += 1
+                continue
+            self.chars_out += len(text)
+            released.append(dict(page, text=text))
+        return released
+
+    def report(self, chunks_before, chunks_after, chunk_bytes=1000, vector_dim=384):
+        """Summary of what was removed, with an estimate of the index size saved.
+
+        Index size is estimated per chunk as its float32 vector plus chunk_bytes
+        of stored document text.
+        """
+        saved = chunks_before - chunks_after
+        return {
+            'pages_in': self.pages_in,
+            'pages_collapsed': self.pages_collapsed,
+            'blocks_dropped': self.boilerplate.blocks_dropped,
+            'text_reduction': 1 - self.chars_out / self.chars_in if self.chars_in else 0.0,
+            'chunks_before': chunks_before,
+            'chunks_after': chunks_after,
+            'chunk_reduction': saved / chunks_before if chunks_before else 0.0,
+            'index_bytes_saved': saved * (vector_dim * 4 + chunk_bytes),
+        }
@@ -0,0 +1,265 @@
+"""Process-wide counters, histograms and span timings for scrape, ingest and query.
+
+Disabled by default: every call returns after one flag check, and span()
+hands back a shared no-op context manager. Enable with STIRBOT_METRICS=1
+or metrics.enable(), then read the numbers with export_json() or
+export_prometheus() (Prometheus text exposition format). Setting
+STIRBOT_METRICS to a file path instead (metrics.json or metrics.prom)
+also writes the metrics there when the process exits.
+
+    from utils import metrics
+
+    metrics.inc("scrape_responses_total", status=200)
+    metrics.observe("chat_tokens_per_sec", 42.0)
+    with metrics.span("search", mode="hybrid"):
+        ...
+
+profile() wraps a block in cProfile or pyinstrument for a deeper look.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; also used for any histogram without its own buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_setting = os.environ.get("STIRBOT_METRICS", "")
+_enabled = bool(_setting) and _setting.lower() not in ("0", "false", "no")
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_buckets = {}
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+
+def enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def set_buckets(name, buckets):
+    """Use custom upper bounds for histogram `name` (e.g. byte sizes instead of seconds)."""
+    _buckets[name] = tuple(sorted(buckets))
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items())) if labels else ()
+
+
+def inc(name, value=1, **labels):
+    """Add value to counter `name`."""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile, capped at the largest value seen."""
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+def observe(name, value, **labels):
+    """Record one value in histogram `name`."""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = _Histogram(_buckets.get(name, DEFAULT_BUCKETS))
+        histogram.observe(value)
+
+
+def percentile(values, p):
+    """Nearest-rank p-th percentile (0-100) of raw values, or 0.0 if there are none."""
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+class _Span:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        observe(f"{self.name}_seconds", time.perf_counter() - self.start, **self.labels)
+        if exc_type is not None:
+            inc(f"{self.name}_errors_total", **self.labels)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name, **labels):
+    """Context manager timing a block into histogram `<name>_seconds`; failures count in `<name>_errors_total`."""
+    if not _enabled:
+        return _NOOP
+    return _Span(name, labels)
+
+
+def _label_text(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+def export_prometheus():
+    """All metrics in Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        typed = set()
+        for (name, labels), value in sorted(_counters.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_label_text(labels)} {value}")
+        for (name, labels), h in sorted(_histograms.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, count in zip(h.buckets, h.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_label_text(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_bucket{_label_text(labels, [('le', '+Inf')])} {h.count}")
+            lines.append(f"{name}_sum{_label_text(labels)} {h.sum}")
+            lines.append(f"{name}_count{_label_text(labels)} {h.count}")
+    return "\n".join(lines) + "\n"
+
+
+def export_json():
+    """All metrics as a dict: counters by name, histograms with count, sum, mean, p50/p95 and max."""
+    def label_name(name, labels):
+        return name + _label_text(labels)
+
+    with _lock:
+        return {
+            "counters": {label_name(n, l): v for (n, l), v in sorted(_counters.items())},
+            "histograms": {
+                label_name(n, l): {
+                    "count": h.count,
+                    "sum": h.sum,
+                    "mean": h.sum / h.count if h.count else 0.0,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "max": h.max,
+                }
+                for (n, l), h in sorted(_histograms.items())
+            },
+        }
+
+
+def dump(path):
+    """Write the metrics to path: Prometheus text for .prom, JSON otherwise."""
+    with open(path, "w") as f:
+        if str(path).endswith(".prom"):
+            f.write(export_prometheus())
+        else:
+            json.dump(export_json(), f, indent=2)
+
+
+if _enabled and _setting.endswith((".json", ".prom")):
+    atexit.register(dump, _setting)
+
+
+@contextmanager
+def profile(tool="cprofile", output=None):
+    """Profile the block with cProfile or pyinstrument; tool=None profiles nothing.
+
+    cProfile stats go to output (a .prof file for snakeviz etc.) or are
+    printed; pyinstrument writes an HTML report to output or prints text.
+    """
+    if not tool:
+        yield
+        return
+    if tool == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("Profiling with pyinstrument requires the 'pyinstrument' package")
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            if output:
+                with open(output, "w") as f:
+                    f.write(profiler.output_html())
+            else:
+                print(profiler.output_text(unicode=True))
+        return
+    if tool != "cprofile":
+        raise ValueError(f"Unknown profiler: {tool}")
+
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        if output:
+            profiler.dump_stats(output)
+        else:
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(30)
@@ -0,0 +1,83 @@
+"""Fingerprints and completion records for pipeline stages (see main.py).
+
+Each stage is recorded with a fingerprint of its config and inputs plus the
+size and mtime of every output it wrote. A stage is still valid while its
+fingerprint is unchanged and its outputs are still there, untouched:
+
+    state = PipelineState()
+    fp = fingerprint({"chunk_size": 1000, "pages": pages_hash})
+    if not state.is_valid("chunk", fp):
+        ...
+        state.record("chunk", fp, ["chunked_data.jsonl"], corpus_hash=file_hash("chunked_data.jsonl"))
+"""
+import hashlib
+import json
+import os
+import time
+
+STATE_FILE = "pipeline_state.json"
+
+
+def fingerprint(config):
+    """Short stable hash of a JSON-serializable config dict."""
+    encoded = json.dumps(config, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def file_hash(path, block_size=1 << 20):
+    """sha256 of a file's contents, or None if it doesn't exist."""
+    if not os.path.isfile(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def output_signature(path):
+    """Size and mtime of a file output; directories (e.g. a database) only need to exist."""
+    if os.path.isdir(path):
+        return {"dir": True}
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class PipelineState:
+    """Stage records kept in a JSON file next to the outputs."""
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.stages = json.load(f)
+        except FileNotFoundError:
+            self.stages = {}
+
+    def get(self, stage):
+        return self.stages.get(stage)
+
+    def is_valid(self, stage, stage_fingerprint):
+        """True if stage last ran with this fingerprint and its outputs are unchanged since."""
+        record = self.stages.get(stage)
+        if record is None or record["fingerprint"] != stage_fingerprint:
+            return False
+        return all(output_signature(path) == signature for path, signature in record["outputs"].items())
+
+    def record(self, stage, stage_fingerprint, outputs, **extra):
+        """Mark stage complete with its outputs (paths); extra values are stored alongside."""
+        self.stages[stage] = {
+            "fingerprint": stage_fingerprint,
+            "outputs": {path: output_signature(path) for path in outputs},
+            "completed_at": time.time(),
+            **extra,
+        }
+        self.save()
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.stages, f, indent=2)
+        os.replace(tmp_path, self.path)
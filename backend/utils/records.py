@@ -0,0 +1,187 @@
+"""Streaming record files: JSON Lines, optionally gzip or zstd compressed.
+
+Legacy JSON array files (chunked_data.json) are still readable through ijson.
+Chunk corpora can also be stored as zstd-compressed Parquet (.parquet, needs
+pyarrow) with url, title, chunk_index, text and path_prefix columns, which
+analytics can scan column by column.
+"""
+import gzip
+import io
+import json
+from urllib.parse import urlparse
+
+PARQUET_COLUMNS = ('url', 'title', 'chunk_index', 'text', 'path_prefix')
+
+
+def _open(path, mode):
+    """Open a record file for text reading ('r') or appending/writing ('a'/'w')."""
+    path = str(path)
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    if path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading/writing .zst files requires the 'zstandard' package")
+        if mode == 'r':
+            # Appending (a resumed crawl) adds a new zstd frame; read them all
+            stream = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True)
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(open(path, mode + 'b'))
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Reading/writing .parquet files requires the 'pyarrow' package")
+    return pyarrow
+
+
+def path_prefix(url, depth=2):
+    """First `depth` path segments of a URL: https://www.stir.ac.uk/study/ug/x/ -> /study/ug"""
+    parts = [p for p in urlparse(url).path.split('/') if p]
+    return '/' + '/'.join(parts[:depth])
+
+
+class _ParquetFile:
+    """Buffers chunk records and writes them as Parquet row groups."""
+
+    def __init__(self, path, row_group_size=50000):
+        pa = _pyarrow()
+        self.schema = pa.schema([
+            ('url', pa.string()),
+            ('title', pa.string()),
+            ('chunk_index', pa.int32()),
+            ('text', pa.string()),
+            ('path_prefix', pa.string()),
+        ])
+        self.writer = pa.parquet.ParquetWriter(str(path), self.schema, compression='zstd')
+        self.row_group_size = row_group_size
+        self.rows = []
+
+    def write(self, record):
+        if 'chunk_index' not in record:
+            raise ValueError("Parquet files hold chunk records only; write page records to JSONL")
+        self.rows.append(record)
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        pa = _pyarrow()
+        columns = {name: [r.get(name) for r in self.rows] for name in PARQUET_COLUMNS}
+        columns['path_prefix'] = [p or path_prefix(url) for p, url in zip(columns['path_prefix'], columns['url'])]
+        self.writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+class RecordWriter:
+    """Append JSON records to a .jsonl / .jsonl.gz / .jsonl.zst file as they arrive.
+
+    A .parquet path writes chunk records as Parquet instead; other records
+    (e.g. crawled pages) raise ValueError there rather than losing fields.
+    Parquet files can't be appended to, so append=True is only supported
+    for JSONL.
+    """
+
+    def __init__(self, path, append=False):
+        self.path = path
+        if str(path).endswith('.parquet'):
+            if append:
+                raise ValueError("Parquet files can't be appended to; write JSONL and convert it afterwards")
+            self.file = None
+            self.parquet = _ParquetFile(path)
+        else:
+            self.file = _open(path, 'a' if append else 'w')
+            self.parquet = None
+        self.count = 0
+
+    def write(self, record):
+        if self.parquet is not None:
+            self.parquet.write(record)
+        else:
+            self.file.write(json.dumps(record, ensure_ascii=False))
+            self.file.write('\n')
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        if self.parquet is not None:
+            self.parquet.close()
+        else:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def iter_record_batches(path, batch_size=10000, columns=None):
+    """Yield lists of up to batch_size records from any record file.
+
+    Parquet files are read one record batch at a time, and only `columns`
+    when given; other formats are streamed and grouped.
+    """
+    path = str(path)
+    if path.endswith('.parquet'):
+        pa = _pyarrow()
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pylist()
+        return
+    batch = []
+    for record in iter_records(path):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_records(path, columns=None):
+    """Yield records from a JSONL file (optionally compressed), a JSON array file or a Parquet file.
+
+    columns limits which Parquet columns are read; it is ignored for JSON.
+    """
+    path = str(path)
+    if path.endswith('.parquet'):
+        for batch in iter_record_batches(path, columns=columns):
+            yield from batch
+        return
+    if path.endswith('.json'):
+        import ijson
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, 'item')
+        return
+    with _open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def convert(source, destination):
+    """Rewrite a record file in another format, e.g. chunked_data.jsonl -> chunked_data.parquet."""
+    with RecordWriter(destination) as writer:
+        writer.write_many(iter_records(source))
+        return writer.count
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python -m utils.records SOURCE DESTINATION")
+    print(f"Wrote {convert(sys.argv[1], sys.argv[2]):,} records to {sys.argv[2]}")
@@ -1,3 +1,28 @@
-from .chroma_client import get_client
-from .loader import load_data
-from .query import search
+"""Vector store: ingest, search and caching over the university_docs collection.
+
+Attributes are imported lazily so `import vector_db` stays cheap; chromadb,
+torch and sentence-transformers load only when first needed.
+"""
+import importlib
+
+_EXPORTS = {
+    'get_client': '.chroma_client',
+    'set_embedding_backend': '.chroma_client',
+    'get_backend': '.embeddings',
+    'get_store': '.store',
+    'IndexConfig': '.index_config',
+    'load_data': '.loader',
+    'search': '.query',
+    'search_hits': '.query',
+    'retrieve': '.query',
+    'cache_stats': '.query',
+    'get_answer_cache': '.answer_cache',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
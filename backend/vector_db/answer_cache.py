@@ -0,0 +1,130 @@
+import threading
+import time
+
+import numpy as np
+
+from .cache import collection_version
+from .query import embed_query, normalize_query
+
+
+class SemanticCache:
+    """Cache of chatbot answers keyed by question meaning rather than exact text.
+
+    A question is embedded with the same model as the collection and
+    compared by cosine similarity against every cached question; the best
+    match at or above threshold is returned with its answer and sources.
+    A brute-force matrix product is exact and takes well under a
+    millisecond for the few thousand entries kept here, so no separate ANN
+    library is needed. Entries expire after ttl seconds and the whole
+    cache is dropped when the collection version changes (re-ingest).
+    """
+
+    def __init__(self, db_path="./chroma_db", threshold=0.92, ttl=7 * 24 * 3600, maxsize=4096):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.entries = []
+        self.vectors = None
+        self.version = collection_version(db_path)
+        self.hits = 0
+        self.misses = 0
+        self.lookup_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def _check_version(self):
+        version = collection_version(self.db_path)
+        if version != self.version:
+            self.entries = []
+            self.vectors = None
+            self.version = version
+
+    def _drop(self, keep):
+        self.entries = [e for e, k in zip(self.entries, keep) if k]
+        self.vectors = self.vectors[np.asarray(keep, dtype=bool)] if self.entries else None
+
+    @staticmethod
+    def _unit(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, question, embedding=None):
+        """Cached entry for a question with the same meaning, or None.
+
+        The entry is a dict with question, answer, sources, similarity and
+        generation_seconds (what producing the answer originally cost).
+        """
+        start = time.perf_counter()
+        if embedding is None:
+            embedding = embed_query(question)
+        query = self._unit(embedding)
+        with self.lock:
+            self._check_version()
+            match = None
+            if self.entries:
+                now = time.time()
+                expired = [now - e['created'] > self.ttl for e in self.entries]
+                if any(expired):
+                    self._drop([not x for x in expired])
+            if self.entries:
+                similarities = self.vectors @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    match = dict(self.entries[best], similarity=float(similarities[best]))
+            if match:
+                self.hits += 1
+                self.saved_seconds += match['generation_seconds']
+            else:
+                self.misses += 1
+            self.lookup_seconds += time.perf_counter() - start
+        return match
+
+    def store(self, question, answer, sources, embedding=None, generation_seconds=0.0):
+        """Remember an answer; generation_seconds is the retrieval + LLM time it took."""
+        if embedding is None:
+            embedding = embed_query(question)
+        vector = self._unit(embedding)[None, :]
+        entry = {
+            'question': normalize_query(question),
+            'answer': answer,
+            'sources': list(sources),
+            'created': time.time(),
+            'generation_seconds': generation_seconds,
+        }
+        with self.lock:
+            self._check_version()
+            self.entries.append(entry)
+            self.vectors = vector if self.vectors is None else np.vstack([self.vectors, vector])
+            if len(self.entries) > self.maxsize:
+                self.entries = self.entries[-self.maxsize:]
+                self.vectors = self.vectors[-self.maxsize:]
+
+    def clear(self):
+        with self.lock:
+            self.entries = []
+            self.vectors = None
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self.entries),
+            'avg_lookup_ms': self.lookup_seconds / total * 1000 if total else 0.0,
+            'seconds_saved': self.saved_seconds,
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_answer_cache(db_path="./chroma_db"):
+    """Return the shared SemanticCache for db_path, creating it on first use."""
+    with _caches_lock:
+        if db_path not in _caches:
+            _caches[db_path] = SemanticCache(db_path)
+        return _caches[db_path]
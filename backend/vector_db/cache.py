@@ -0,0 +1,70 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+VERSION_FILE = "collection_version"
+
+
+class LRUCache:
+    """Thread-safe LRU cache with optional per-entry TTL and hit/miss counters."""
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self.data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self.lock:
+            expires = time.monotonic() + self.ttl if self.ttl else None
+            self.data[key] = (value, expires)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self.data),
+        }
+
+
+def collection_version(db_path="./chroma_db"):
+    """Current version stamp of the collection, changed by every ingest."""
+    try:
+        with open(os.path.join(db_path, VERSION_FILE)) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return "0"
+
+
+def bump_collection_version(db_path="./chroma_db"):
+    """Mark the collection as changed, invalidating cached search results in every process."""
+    os.makedirs(db_path, exist_ok=True)
+    version = str(time.time_ns())
+    with open(os.path.join(db_path, VERSION_FILE), "w") as f:
+        f.write(version)
+    return version
@@ -0,0 +1,83 @@
+"""Chroma embedding functions.
+
+Chroma requires these to subclass its EmbeddingFunction, so they live apart
+from chroma_client and embeddings and are imported only when an embedding
+function is built; importing the rest of vector_db doesn't load chromadb.
+"""
+from chromadb.utils.embedding_functions import EmbeddingFunction
+
+
+### GPUEmbeddingFunction - Generated by Claude Haiku 4.5 on 2026-02-05
+### Prompt: Create a custom embedding function that explicitly uses GPU for sentence-transformers
+### Model: all-MiniLM-L6-v2 | Purpose: Enable GPU acceleration for vector embeddings in ChromaDB
+###
+
+class GPUEmbeddingFunction(EmbeddingFunction):
+    """Custom embedding function that attempts GPU, falls back to CPU if needed.
+
+    torch and sentence-transformers are imported and the model is loaded on
+    first use, so creating the function is free.
+    """
+    def __init__(self, model_name="all-MiniLM-L6-v2"):
+        self.model_name = model_name
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            import torch
+            from sentence_transformers import SentenceTransformer
+
+            # Try GPU first
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            print(f"Loading model on device: {self.device}")
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+            self.gpu_available = torch.cuda.is_available()
+            print(f"Model loaded successfully on {self.device}")
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+
+    def __call__(self, texts):
+        """Embed texts, fall back to CPU if CUDA kernel not available"""
+        if isinstance(texts, str):
+            texts = [texts]
+
+        try:
+            embeddings = self.model.encode(texts, convert_to_numpy=True)
+            return embeddings.tolist()
+        except RuntimeError as e:
+            if "CUDA" in str(e) and self.gpu_available:
+                print(f"\n⚠️  CUDA kernel not available for RTX 5080, falling back to CPU")
+                self.device = "cpu"
+                self.model = self.model.to("cpu")
+                self.gpu_available = False
+                embeddings = self.model.encode(texts, convert_to_numpy=True)
+                return embeddings.tolist()
+            else:
+                raise
+
+### End AI GENERATED CODE ---- GPUEmbeddingFunction ###
+
+
+class BackendEmbeddingFunction(EmbeddingFunction):
+    """Chroma embedding function backed by an EmbeddingBackend."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __call__(self, input):
+        return list(self.backend.encode(list(input)))
+
+
+class ProjectedEmbeddingFunction(EmbeddingFunction):
+    """Chroma embedding function that embeds with `base`, then applies a PCAProjection (see index_config)."""
+
+    def __init__(self, base, projection):
+        self.base = base
+        self.projection = projection
+
+    def __call__(self, input):
+        return list(self.projection(self.base(input)))
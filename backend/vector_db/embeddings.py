@@ -0,0 +1,149 @@
+"""Embedding backends for all-MiniLM-L6-v2.
+
+Every backend returns float32 numpy arrays of shape (n, dim) with no list
+round-trips, and encodes length-sorted, dynamically sized batches so short
+chunks aren't padded up to the longest chunk in a fixed-size batch.
+
+    torch        sentence-transformers on GPU if available, else CPU
+    onnx         ONNX Runtime on CPU
+    onnx-int8    ONNX Runtime with the int8-quantized model
+    multiprocess one CPU encoder process per worker
+
+The onnx backends need the optional sentence-transformers[onnx] extra.
+"""
+import os
+
+import numpy as np
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+# int8 dynamic-quantized export shipped in the model repo (AVX2 is the widest-supported variant)
+QUANTIZED_ONNX_FILE = "onnx/model_quint8_avx2.onnx"
+
+
+def dynamic_batches(texts, batch_tokens=16384, max_batch=512):
+    """Split texts into length-sorted batches of roughly batch_tokens padded tokens.
+
+    Returns (order, batches) where order is the permutation applied to texts
+    and batches is a list of lists of texts in that order. Batch size shrinks
+    for long texts and grows for short ones, since padded cost is
+    batch size x longest text.
+    """
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    order = np.argsort(-lengths, kind="stable")
+    batches = []
+    i = 0
+    while i < len(order):
+        # ~4 characters per token; the first text of each batch is its longest
+        longest = max(int(lengths[order[i]]) // 4, 1)
+        size = int(min(max(batch_tokens // longest, 1), max_batch))
+        batches.append([texts[j] for j in order[i:i + size]])
+        i += size
+    return order, batches
+
+
+class EmbeddingBackend:
+    """Base class: encode(texts) -> float32 ndarray of shape (len(texts), dim)."""
+
+    name = "base"
+
+    def encode_batch(self, batch):
+        raise NotImplementedError
+
+    def encode(self, texts):
+        if isinstance(texts, str):
+            texts = [texts]
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        order, batches = self.batches(texts)
+        encoded = np.concatenate([self.encode_batch(batch) for batch in batches])
+        out = np.empty_like(encoded, dtype=np.float32)
+        out[order] = encoded
+        return out
+
+    def batches(self, texts):
+        return dynamic_batches(texts)
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """sentence-transformers model, loaded on first use.
+
+    backend="onnx" runs the model through ONNX Runtime; onnx_file selects a
+    specific export, e.g. the int8-quantized one.
+    """
+
+    def __init__(self, model_name=DEFAULT_MODEL, device=None, backend="torch", onnx_file=None,
+                 batch_tokens=16384, max_batch=512):
+        self.model_name = model_name
+        self.device = device
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self.batch_tokens = batch_tokens
+        self.max_batch = max_batch
+        self.name = backend if not onnx_file else f"{backend}:{os.path.basename(onnx_file)}"
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            kwargs = {"backend": self.backend}
+            if self.onnx_file:
+                kwargs["model_kwargs"] = {"file_name": self.onnx_file}
+            device = self.device
+            if device is None and self.backend == "torch":
+                import torch
+                device = "cuda" if torch.cuda.is_available() else "cpu"
+            self._model = SentenceTransformer(self.model_name, device=device or "cpu", **kwargs)
+        return self._model
+
+    def batches(self, texts):
+        return dynamic_batches(texts, self.batch_tokens, self.max_batch)
+
+    def encode_batch(self, batch):
+        embeddings = self.model.encode(batch, batch_size=len(batch), convert_to_numpy=True)
+        return embeddings.astype(np.float32, copy=False)
+
+
+class MultiProcessBackend(SentenceTransformerBackend):
+    """Encodes on a pool of CPU processes, one model copy per process."""
+
+    def __init__(self, model_name=DEFAULT_MODEL, workers=None, backend="torch", onnx_file=None,
+                 batch_size=64):
+        super().__init__(model_name, device="cpu", backend=backend, onnx_file=onnx_file)
+        self.workers = workers or os.cpu_count()
+        self.batch_size = batch_size
+        self.name = f"multiprocess x{self.workers}"
+        self._pool = None
+
+    def encode(self, texts):
+        if isinstance(texts, str):
+            texts = [texts]
+        if self._pool is None:
+            self._pool = self.model.start_multi_process_pool(target_devices=["cpu"] * self.workers)
+        # Sort by length so each worker's batches carry little padding
+        order, batches = self.batches(texts)
+        sorted_texts = [t for batch in batches for t in batch]
+        encoded = self.model.encode(sorted_texts, pool=self._pool, batch_size=self.batch_size,
+                                    convert_to_numpy=True)
+        out = np.empty_like(encoded, dtype=np.float32)
+        out[order] = encoded
+        return out
+
+    def close(self):
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+
+def get_backend(name="torch", model_name=DEFAULT_MODEL, **kwargs):
+    """Build an embedding backend by name: torch, onnx, onnx-int8 or multiprocess."""
+    if name == "torch":
+        return SentenceTransformerBackend(model_name, **kwargs)
+    if name == "onnx":
+        return SentenceTransformerBackend(model_name, backend="onnx", **kwargs)
+    if name == "onnx-int8":
+        return SentenceTransformerBackend(model_name, backend="onnx", onnx_file=QUANTIZED_ONNX_FILE, **kwargs)
+    if name == "multiprocess":
+        return MultiProcessBackend(model_name, **kwargs)
+    raise ValueError(f"Unknown embedding backend: {name}")
@@ -0,0 +1,100 @@
+import json
+import os
+from dataclasses import asdict, dataclass, fields
+
+import numpy as np
+
+CONFIG_FILE = "index_config.json"
+PCA_FILE = "pca.npz"
+SPACES = ("l2", "cosine", "ip")
+
+
+@dataclass
+class IndexConfig:
+    """HNSW and vector settings for the collection, saved next to chroma_db.
+
+    space, M and ef_construction are fixed when the collection is created;
+    ef_search, batch_size and sync_threshold can be changed on an existing
+    collection. pca_dims, when set, projects every embedding onto that many
+    principal components (fitted on pca_sample chunks at ingest), shrinking
+    the stored vectors and the HNSW graph's distance cost proportionally.
+    """
+    space: str = "l2"
+    M: int = 16
+    ef_construction: int = 100
+    ef_search: int = 100
+    batch_size: int = 100
+    sync_threshold: int = 1000
+    pca_dims: int = None
+    pca_sample: int = 20000
+
+    def __post_init__(self):
+        if self.space not in SPACES:
+            raise ValueError(f"Unknown space: {self.space} (expected one of {SPACES})")
+
+    def hnsw(self):
+        """Chroma collection configuration for these settings."""
+        return {"hnsw": {
+            "space": self.space,
+            "max_neighbors": self.M,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+            "batch_size": self.batch_size,
+            "sync_threshold": self.sync_threshold,
+        }}
+
+    def save(self, db_path):
+        os.makedirs(db_path, exist_ok=True)
+        with open(os.path.join(db_path, CONFIG_FILE), "w") as f:
+            json.dump(asdict(self), f, indent=2)
+
+    @classmethod
+    def load(cls, db_path):
+        """The saved config for db_path, or the defaults if there is none."""
+        try:
+            with open(os.path.join(db_path, CONFIG_FILE)) as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in saved.items() if k in names})
+
+
+class PCAProjection:
+    """Linear projection of embeddings onto their top principal components, renormalized."""
+
+    def __init__(self, mean, components):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+
+    @classmethod
+    def fit(cls, embeddings, dims):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if dims >= embeddings.shape[1]:
+            raise ValueError(f"pca_dims {dims} must be below the embedding size {embeddings.shape[1]}")
+        mean = embeddings.mean(axis=0)
+        _, _, vt = np.linalg.svd(embeddings - mean, full_matrices=False)
+        return cls(mean, vt[:dims])
+
+    def explained_variance(self, embeddings):
+        """Fraction of the variance in embeddings kept by the projection."""
+        centered = np.asarray(embeddings, dtype=np.float32) - self.mean
+        projected = centered @ self.components.T
+        return float((projected ** 2).sum() / (centered ** 2).sum())
+
+    def __call__(self, embeddings):
+        projected = (np.asarray(embeddings, dtype=np.float32) - self.mean) @ self.components.T
+        norms = np.linalg.norm(projected, axis=-1, keepdims=True)
+        return projected / np.where(norms == 0, 1, norms)
+
+    def save(self, db_path):
+        np.savez(os.path.join(db_path, PCA_FILE), mean=self.mean, components=self.components)
+
+    @classmethod
+    def load(cls, db_path):
+        path = os.path.join(db_path, PCA_FILE)
+        if not os.path.exists(path):
+            return None
+        data = np.load(path)
+        return cls(data["mean"], data["components"])
+
@@ -0,0 +1,125 @@
+import re
+import sqlite3
+import threading
+
+# Too common to help ranking, and expensive to OR together over millions of chunks
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'for', 'from', 'how',
+    'i', 'in', 'is', 'it', 'of', 'on', 'or', 'the', 'there', 'to', 'what', 'when', 'where',
+    'which', 'who', 'why', 'with', 'you', 'your', 'my', 'me', 'we', 'our', 'this', 'that',
+}
+_WORD = re.compile(r"\w+")
+
+
+def query_terms(query):
+    """Distinct lowercase query terms, without stopwords unless that leaves nothing."""
+    terms = [t for t in _WORD.findall(query.lower()) if t not in STOPWORDS]
+    return list(dict.fromkeys(terms or _WORD.findall(query.lower())))
+
+
+class LexicalIndex:
+    """BM25 inverted index over the collection's chunk IDs, stored in SQLite FTS5.
+
+    Lives next to chroma_db and is kept in step with the collection by
+    load_data. The FTS rowid maps to the chunk ID through the ids table, so
+    updates and deletes by chunk ID don't scan the index. The number of
+    chunks is kept in the stats table so queries don't count them.
+    """
+
+    def __init__(self, path, max_df_ratio=0.05, min_df=1000):
+        self.max_df_ratio = max_df_ratio
+        self.min_df = min_df
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("CREATE TABLE IF NOT EXISTS ids (rowid INTEGER PRIMARY KEY, id TEXT UNIQUE)")
+        self.conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5("
+            "url UNINDEXED, title, text, tokenize='porter unicode61')"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS stats (key TEXT PRIMARY KEY, value INTEGER)")
+        # Indexes written before the count was kept are counted once
+        self.conn.execute("INSERT OR IGNORE INTO stats VALUES ('documents', (SELECT COUNT(*) FROM ids))")
+        self.conn.commit()
+
+    def _add_documents(self, n):
+        self.conn.execute("UPDATE stats SET value = value + ? WHERE key = 'documents'", (n,))
+
+    def _delete(self, ids):
+        deleted = 0
+        for i in ids:
+            row = self.conn.execute("SELECT rowid FROM ids WHERE id = ?", (i,)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM chunks WHERE rowid = ?", row)
+                self.conn.execute("DELETE FROM ids WHERE rowid = ?", row)
+                deleted += 1
+        self._add_documents(-deleted)
+
+    def upsert(self, ids, documents, metadatas):
+        with self.lock:
+            self._delete(ids)
+            for i, doc, meta in zip(ids, documents, metadatas):
+                rowid = self.conn.execute("INSERT INTO ids (id) VALUES (?)", (i,)).lastrowid
+                self.conn.execute(
+                    "INSERT INTO chunks (rowid, url, title, text) VALUES (?, ?, ?, ?)",
+                    (rowid, meta.get('url', ''), meta.get('title', ''), doc)
+                )
+            self._add_documents(len(ids))
+            self.conn.commit()
+
+    def delete(self, ids):
+        with self.lock:
+            self._delete(ids)
+            self.conn.commit()
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM chunks")
+            self.conn.execute("DELETE FROM ids")
+            self.conn.execute("UPDATE stats SET value = 0 WHERE key = 'documents'")
+            self.conn.commit()
+
+    def match_expression(self, query):
+        """FTS5 MATCH expression ORing the query terms worth scoring.
+
+        Terms found in more than max_df_ratio of chunks (and more than min_df
+        chunks, below which any term is cheap) add almost nothing to BM25
+        (their IDF is near zero) but dominate query cost, so they are
+        dropped. If every term is that common the expression is empty and
+        the search returns nothing, leaving hybrid search to the dense results.
+        """
+        terms = query_terms(query)
+        if not terms:
+            return ""
+        limit = int(max(self.max_df_ratio * self.count(), self.min_df))
+        rare = []
+        for term in terms:
+            # Stops counting past the limit, so a common term costs no more than a rare one
+            df = self.conn.execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM chunks WHERE chunks MATCH ? LIMIT ?)",
+                (f'"{term}"', limit + 1)
+            ).fetchone()[0]
+            if df <= limit:
+                rare.append(term)
+        return " OR ".join(f'"{t}"' for t in rare)
+
+    def search(self, query, n_results=5):
+        """Top chunks by BM25 (title weighted 2x), best first, as hit dicts."""
+        with self.lock:
+            expression = self.match_expression(query)
+            if not expression:
+                return []
+            rows = self.conn.execute(
+                "SELECT ids.id, chunks.url, chunks.title, chunks.text, bm25(chunks, 0.0, 2.0, 1.0) AS score "
+                "FROM chunks JOIN ids ON ids.rowid = chunks.rowid "
+                "WHERE chunks MATCH ? ORDER BY score LIMIT ?",
+                (expression, n_results)
+            ).fetchall()
+        # SQLite's bm25() is negative, lower is better
+        return [{'id': r[0], 'url': r[1], 'title': r[2], 'text': r[3], 'score': -r[4]} for r in rows]
+
+    def count(self):
+        return self.conn.execute("SELECT value FROM stats WHERE key = 'documents'").fetchone()[0]
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
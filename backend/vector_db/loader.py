@@ -1,77 +1,165 @@
 import os
-import ijson
 import time
+from itertools import islice
 from tqdm import tqdm
 
 # Enable GPU for embeddings
 os.environ["CUDA_VISIBLE_DEVICES"] = "0"
 
-from .chroma_client import get_client, get_embedding_function
+from .store import get_store
+from .manifest import IngestManifest, chunk_hash
+from .cache import bump_collection_version
+from .pipeline import IngestPipeline, print_pipeline_stats
+from utils import metrics
+from utils.records import iter_records
 
-def load_data(json_file="chunked_data.json", batch_size=5000):
+CHUNK_COLUMNS = ['url', 'title', 'chunk_index', 'text']
+
+
+def pending_batches(records, batch_size, manifest, incremental, counts):
+    """Group records into batches of new or changed chunks.
+
+    Unchanged chunks are marked as seen in the manifest and counted as
+    skipped instead of being yielded. counts['read'] and counts['skipped']
+    are updated as records stream past.
+    """
+    def pending(batch):
+        existing = manifest.lookup(batch) if incremental else {}
+        unchanged = [i for i, (chunk, h) in batch.items() if existing.get(i) == h]
+        manifest.touch(unchanged)
+        counts['skipped'] += len(unchanged)
+
+        ids = [i for i in batch if existing.get(i) != batch[i][1]]
+        if not ids:
+            return None
+        return {
+            'ids': ids,
+            'documents': [batch[i][0]['text'] for i in ids],
+            'metadatas': [{'url': batch[i][0]['url'], 'title': batch[i][0]['title']} for i in ids],
+            'hashes': [batch[i][1] for i in ids],
+        }
+
+    batch = {}
+    for chunk in records:
+        batch[f"{chunk['url']}_{chunk['chunk_index']}"] = (chunk, chunk_hash(chunk))
+        counts['read'] += 1
+
+        if len(batch) >= batch_size:
+            result = pending(batch)
+            if result:
+                yield result
+            batch = {}
+
+    # Remaining chunks
+    if batch:
+        result = pending(batch)
+        if result:
+            yield result
+
+
+def load_data(json_file="chunked_data.jsonl", batch_size=5000, incremental=False, db_path="./chroma_db",
+              pipelined=False, embed_workers=1, write_workers=1, queue_size=4, index_config=None):
+    """Load chunked data into the university_docs collection.
+
+    json_file is streamed in a single pass; it may be JSON Lines (optionally
+    .gz/.zst compressed), a legacy JSON array or a Parquet corpus, which is
+    read in record batches of only the columns needed here.
+
+    By default the collection is wiped and rebuilt. With incremental=True only
+    new or changed chunks are embedded (upserted), unchanged chunks are skipped
+    and chunks that disappeared from the file are deleted, using the ingest
+    manifest stored next to the database. The BM25 lexical index is updated
+    with the same chunk IDs.
+
+    With pipelined=True, parsing, embedding and Chroma writes run as separate
+    stages connected by bounded queues (see vector_db.pipeline), with
+    embed_workers and write_workers threads and a single parse thread, and
+    per-stage stats are printed.
+
+    index_config (a vector_db.index_config.IndexConfig) replaces the saved
+    HNSW/PCA settings for db_path; a full rebuild applies all of them. When
+    PCA is enabled, the projection is refitted on the first pca_sample
+    chunks before anything is embedded.
+    """
     start_time = time.time()
-    client = get_client()
-    embedding_fn = get_embedding_function()
-
-    # Delete existing collection
-    try:
-        client.delete_collection("university_docs")
-        print(" Wiped existing collection")
-    except:
-        pass
-
-    # Create fresh collection with GPU embedding function
-    collection = client.get_or_create_collection("university_docs", embedding_function=embedding_fn)
-
-    # Count total chunks first for progress bar
-    print(" Counting chunks...")
-    total_count = 0
-    with open(json_file, 'rb') as f:
-        for _ in ijson.items(f, 'item'):
-            total_count += 1
-
-    # Stream chunks from JSON file instead of loading entire file into memory
-    documents = []
-    metadatas = []
-    ids = []
-    total_chunks = 0
+    store = get_store(db_path)
+    os.makedirs(db_path, exist_ok=True)
+    manifest = IngestManifest(os.path.join(db_path, "ingest_manifest.db"))
+
+    if index_config is not None:
+        store.set_index_config(index_config)
+
+    if not incremental:
+        # Delete existing collection
+        store.delete_collection()
+        store.lexical.clear()
+        manifest.clear()
+
+    config = store.index_config
+    if config.pca_dims and (not incremental or store.projection is None):
+        sample = [chunk['text'] for chunk in islice(iter_records(json_file, columns=['text']), config.pca_sample)]
+        variance = store.fit_pca(sample)
+        print(f" PCA: {config.pca_dims} dims keep {variance:.1%} of the variance ({len(sample)} sample chunks)")
+
+    # Create collection with GPU embedding function
+    collection = store.collection
+
+    # Stream chunks from the file instead of loading it all into memory
+    counts = {'read': 0, 'skipped': 0}
+    pbar = tqdm(iter_records(json_file, columns=CHUNK_COLUMNS), desc="Loading chunks", unit="chunk")
+    batches = pending_batches(pbar, batch_size, manifest, incremental, counts)
+    embedded = 0
     batch_count = 0
 
-    with open(json_file, 'rb') as f:
-        pbar = tqdm(ijson.items(f, 'item'), total=total_count, desc="Loading chunks", unit="chunk")
-        for chunk in pbar:
-            documents.append(chunk['text'])
-            metadatas.append({'url': chunk['url'], 'title': chunk['title']})
-            ids.append(f"{chunk['url']}_{chunk['chunk_index']}")
-            total_chunks += 1
-
-            # Add batch when we reach batch_size
-            if len(documents) >= batch_size:
-                collection.add(
-                    documents=documents,
-                    metadatas=metadatas,
-                    ids=ids
+    if pipelined:
+        pipeline = IngestPipeline(store.embedding_fn, collection, manifest,
+                                  embed_workers=embed_workers, write_workers=write_workers,
+                                  queue_size=queue_size, lexical=store.lexical)
+        stats = pipeline.run(batches)
+        embedded = stats['write']['items']
+        batch_count = stats['write']['batches']
+    else:
+        for batch in batches:
+            # Chroma embeds the documents inside upsert
+            with metrics.span("ingest_upsert"):
+                collection.upsert(
+                    documents=batch['documents'],
+                    metadatas=batch['metadatas'],
+                    ids=batch['ids']
                 )
-                batch_count += 1
-                pbar.set_postfix({'batches': batch_count})
-                documents = []
-                metadatas = []
-                ids = []
-
-    # Add remaining chunks
-    if documents:
-        collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
-        batch_count += 1
+            with metrics.span("ingest_lexical"):
+                store.lexical.upsert(batch['ids'], batch['documents'], batch['metadatas'])
+            manifest.record(batch['ids'], batch['hashes'])
+            embedded += len(batch['ids'])
+            batch_count += 1
+            pbar.set_postfix({'batches': batch_count, 'skipped': counts['skipped']})
+    pbar.close()
+
+    # Delete chunks whose page or chunk index no longer exists
+    stale = manifest.stale_ids()
+    for i in range(0, len(stale), batch_size):
+        collection.delete(ids=stale[i:i + batch_size])
+    store.lexical.delete(stale)
+    manifest.remove(stale)
+    manifest.close()
+    if embedded or stale or not incremental:
+        # Invalidate cached search results
+        bump_collection_version(db_path)
 
     total_vectors = collection.count()
     elapsed_time = time.time() - start_time
-    print(f"\n Created {total_chunks} vectors in {batch_count} batches")
+    metrics.observe("ingest_seconds", elapsed_time)
+    metrics.inc("ingest_chunks_total", embedded, result="embedded")
+    metrics.inc("ingest_chunks_total", counts['skipped'], result="skipped")
+    metrics.inc("ingest_chunks_total", len(stale), result="deleted")
+    print(f"\n Read {counts['read']} chunks: {embedded} embedded in {batch_count} batches, "
+          f"{counts['skipped']} unchanged and skipped, {len(stale)} deleted")
+    if pipelined:
+        print_pipeline_stats(stats)
     print(f" Collection: '{collection.name}' now contains {total_vectors} total vectors")
     print(f" Total ingestion time: {elapsed_time:.2f} seconds")
+    return {'embedded': embedded, 'skipped': counts['skipped'], 'deleted': len(stale)}
 
 if __name__ == "__main__":
-    load_data()
+    import sys
+    load_data(incremental="--incremental" in sys.argv, pipelined="--pipelined" in sys.argv)
@@ -0,0 +1,74 @@
+import hashlib
+import sqlite3
+import threading
+
+
+def chunk_hash(chunk):
+    """Content hash of a chunk: text plus the metadata stored alongside it."""
+    key = f"{chunk['url']}\0{chunk['title']}\0{chunk['text']}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class IngestManifest:
+    """On-disk record of the chunk IDs and hashes held in the collection.
+
+    Each ingest run stamps the IDs it sees with a run number, so IDs left on
+    an older run afterwards are chunks that disappeared from the corpus.
+    Safe to share between the threads of a pipelined ingest.
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks (id TEXT PRIMARY KEY, hash TEXT, run INTEGER)"
+        )
+        self.conn.commit()
+        self.run = (self.conn.execute("SELECT MAX(run) FROM chunks").fetchone()[0] or 0) + 1
+
+    def lookup(self, ids):
+        """Return {id: hash} for the given IDs that are already ingested."""
+        found = {}
+        ids = list(ids)
+        with self.lock:
+            for i in range(0, len(ids), 900):
+                part = ids[i:i + 900]
+                placeholders = ",".join("?" * len(part))
+                found.update(self.conn.execute(
+                    f"SELECT id, hash FROM chunks WHERE id IN ({placeholders})", part
+                ))
+        return found
+
+    def touch(self, ids):
+        """Mark unchanged IDs as seen in this run."""
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE chunks SET run = ? WHERE id = ?", ((self.run, i) for i in ids)
+            )
+
+    def record(self, ids, hashes):
+        """Record IDs that were embedded in this run."""
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO chunks (id, hash, run) VALUES (?, ?, ?)",
+                ((i, h, self.run) for i, h in zip(ids, hashes))
+            )
+            self.conn.commit()
+
+    def stale_ids(self):
+        """IDs not seen in this run, i.e. chunks that no longer exist."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT id FROM chunks WHERE run < ?", (self.run,)
+        )]
+
+    def remove(self, ids):
+        self.conn.executemany("DELETE FROM chunks WHERE id = ?", ((i,) for i in ids))
+        self.conn.commit()
+
+    def clear(self):
+        self.conn.execute("DELETE FROM chunks")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,190 @@
+"""Pipelined ingest: parse, embed and write stages connected by bounded queues.
+
+The embed and write stages run on as many threads as configured, so JSON
+parsing, embedding and Chroma writes overlap and ingest wall time
+approaches the cost of the slowest stage. Parsing is deliberately a
+single thread: it drains one generator (loader.pending_batches) that reads
+the chunk file in order and checks each batch against the manifest, and
+its JSON decoding holds the GIL, so more threads would only contend for
+the iterator. Embedding is the slow stage; an embed queue depth near
+zero in the printed stats would show parsing keeping it waiting.
+Batches are dicts with 'ids', 'documents', 'metadatas' and 'hashes'; the
+embed stage adds 'embeddings', which the write stage passes straight to
+collection.upsert so Chroma doesn't embed again.
+"""
+import queue
+import threading
+import time
+
+import numpy as np
+
+from utils import metrics
+
+_DONE = object()
+
+
+class StageStats:
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.batches = 0
+        self.items = 0
+        self.busy = 0.0
+        self.depth_total = 0
+        self.depth_samples = 0
+        self.depth_max = 0
+        self.lock = threading.Lock()
+
+    def record(self, items, seconds):
+        with self.lock:
+            self.batches += 1
+            self.items += items
+            self.busy += seconds
+        metrics.observe(f"ingest_{self.name}_seconds", seconds)
+        metrics.inc(f"ingest_{self.name}_items_total", items)
+
+    def sample_depth(self, depth):
+        with self.lock:
+            self.depth_total += depth
+            self.depth_samples += 1
+            self.depth_max = max(self.depth_max, depth)
+
+    def summary(self):
+        # Throughput per worker-second of busy time, times workers
+        rate = self.items / self.busy * self.workers if self.busy else 0.0
+        return {
+            'workers': self.workers,
+            'batches': self.batches,
+            'items': self.items,
+            'busy_seconds': round(self.busy, 3),
+            'items_per_sec': round(rate, 1),
+            'queue_depth_avg': round(self.depth_total / self.depth_samples, 2) if self.depth_samples else 0.0,
+            'queue_depth_max': self.depth_max,
+        }
+
+
+class IngestPipeline:
+    """Run batches through parse -> embed -> write with embed_workers and write_workers threads.
+
+    The parse stage (iterating `batches`) always runs on one thread; see
+    the module docstring.
+    """
+
+    def __init__(self, embed_fn, collection, manifest=None, embed_workers=1, write_workers=1, queue_size=4,
+                 lexical=None):
+        self.embed_fn = embed_fn
+        self.collection = collection
+        self.manifest = manifest
+        self.lexical = lexical
+        self.queue_size = queue_size
+        self.stats = {
+            'parse': StageStats('parse', 1),
+            'embed': StageStats('embed', embed_workers),
+            'write': StageStats('write', write_workers),
+        }
+        self.failed = threading.Event()
+        self.error = None
+
+    def embed(self, batch):
+        batch['embeddings'] = np.asarray(self.embed_fn(batch['documents']), dtype=np.float32)
+        return batch
+
+    def write(self, batch):
+        self.collection.upsert(
+            ids=batch['ids'],
+            documents=batch['documents'],
+            metadatas=batch['metadatas'],
+            embeddings=batch['embeddings'],
+        )
+        if self.lexical:
+            self.lexical.upsert(batch['ids'], batch['documents'], batch['metadatas'])
+        if self.manifest:
+            self.manifest.record(batch['ids'], batch['hashes'])
+        return batch
+
+    def _fail(self, error):
+        if not self.failed.is_set():
+            self.error = error
+            self.failed.set()
+
+    def _parse(self, batches, outbox, consumers):
+        stats = self.stats['parse']
+        iterator = iter(batches)
+        try:
+            while not self.failed.is_set():
+                start = time.perf_counter()
+                try:
+                    batch = next(iterator)
+                except StopIteration:
+                    break
+                stats.record(len(batch['ids']), time.perf_counter() - start)
+                self.stats['embed'].sample_depth(outbox.qsize())
+                outbox.put(batch)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            for _ in range(consumers):
+                outbox.put(_DONE)
+
+    def _work(self, name, fn, inbox, outbox, consumers, remaining):
+        stats = self.stats[name]
+        while True:
+            batch = inbox.get()
+            if batch is _DONE:
+                break
+            if self.failed.is_set():
+                continue  # keep draining so upstream never blocks on a full queue
+            start = time.perf_counter()
+            try:
+                result = fn(batch)
+            except BaseException as e:
+                self._fail(e)
+                continue
+            stats.record(len(batch['ids']), time.perf_counter() - start)
+            if outbox is not None:
+                self.stats['write'].sample_depth(outbox.qsize())
+                outbox.put(result)
+        with remaining['lock']:
+            remaining[name] -= 1
+            last = remaining[name] == 0
+        if last and outbox is not None:
+            for _ in range(consumers):
+                outbox.put(_DONE)
+
+    def run(self, batches):
+        """Consume an iterable of batches. Returns per-stage stats; re-raises stage errors."""
+        embed_queue = queue.Queue(self.queue_size)
+        write_queue = queue.Queue(self.queue_size)
+        embed_workers = self.stats['embed'].workers
+        write_workers = self.stats['write'].workers
+        remaining = {'lock': threading.Lock(), 'embed': embed_workers, 'write': write_workers}
+
+        threads = [threading.Thread(target=self._parse, args=(batches, embed_queue, embed_workers))]
+        threads += [
+            threading.Thread(target=self._work,
+                             args=('embed', self.embed, embed_queue, write_queue, write_workers, remaining))
+            for _ in range(embed_workers)
+        ]
+        threads += [
+            threading.Thread(target=self._work, args=('write', self.write, write_queue, None, 0, remaining))
+            for _ in range(write_workers)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self.error:
+            raise self.error
+
+        summary = {name: stats.summary() for name, stats in self.stats.items()}
+        summary['wall_seconds'] = round(time.perf_counter() - start, 3)
+        return summary
+
+
+def print_pipeline_stats(summary):
+    print(f" Pipeline wall time: {summary['wall_seconds']:.2f}s")
+    for name in ('parse', 'embed', 'write'):
+        s = summary[name]
+        print(f"   {name:<6} x{s['workers']}  {s['items']:>9} chunks  {s['items_per_sec']:>9.1f} chunks/s  "
+              f"busy {s['busy_seconds']:.2f}s  queue depth avg {s['queue_depth_avg']} max {s['queue_depth_max']}")
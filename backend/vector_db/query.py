@@ -1,19 +1,128 @@
-from .chroma_client import get_client
+from utils import metrics
+from .chroma_client import get_embedding_function
+from .store import get_store
+from .cache import LRUCache, collection_version
 
-def search(query, n_results=5):
-    client = get_client()
-    collection = client.get_or_create_collection("university_docs")
-    results = collection.query(query_texts=[query], n_results=n_results)
+# Query embeddings depend only on the text; results also on the collection version
+embedding_cache = LRUCache(maxsize=4096, ttl=24 * 3600)
+result_cache = LRUCache(maxsize=1024, ttl=3600)
 
-    context_parts = []
-    for doc, metadata in zip(results['documents'][0], results['metadatas'][0]):
-        print(f"\nURL: {metadata['url']}")
-        print(f"Text: {doc[:200]}...\n")
-        context_parts.append(f"Source: {metadata['url']}\n{doc}")
+SEARCH_MODES = ("vector", "lexical", "hybrid")
+
+
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+def embed_query(query):
+    """Embed a query, reusing the cached vector for repeated (normalized) queries."""
+    key = normalize_query(query)
+    embedding = embedding_cache.get(key)
+    if embedding is None:
+        with metrics.span("query_embed"):
+            embedding = get_embedding_function()([key])[0]
+        embedding_cache.put(key, embedding)
+    return embedding
+
+
+def vector_search(query, n_results=5, db_path="./chroma_db", embedding=None):
+    """Dense retrieval from the Chroma collection, as hit dicts."""
+    if embedding is None:
+        embedding = embed_query(query)
+    results = get_store(db_path).query(embedding, n_results)
+    return [
+        {'id': i, 'url': meta['url'], 'title': meta.get('title', ''), 'text': doc, 'score': -distance}
+        for i, doc, meta, distance in zip(
+            results['ids'][0], results['documents'][0], results['metadatas'][0], results['distances'][0]
+        )
+    ]
+
+
+def reciprocal_rank_fusion(rankings, n_results=5, k=60):
+    """Fuse ranked hit lists: each hit scores sum(1 / (k + rank)) over the lists it appears in."""
+    scores = {}
+    hits = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, 1):
+            scores[hit['id']] = scores.get(hit['id'], 0.0) + 1.0 / (k + rank)
+            hits.setdefault(hit['id'], hit)
+    best = sorted(scores, key=scores.get, reverse=True)[:n_results]
+    return [dict(hits[i], score=scores[i]) for i in best]
+
+
+def retrieve(query, n_results=5, mode="vector", db_path="./chroma_db", embedding=None):
+    """Top chunks for a query as dicts with id, url, title, text and score.
+
+    mode is "vector" (dense MiniLM), "lexical" (BM25) or "hybrid", which
+    fuses both rankings with reciprocal rank fusion so exact matches such
+    as course codes and building names aren't missed. A precomputed query
+    embedding can be passed to skip encoding the query.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode}")
+    key = (normalize_query(query), n_results, mode, collection_version(db_path))
+    hits = result_cache.get(key)
+    metrics.inc("retrieve_total", mode=mode, cached=hits is not None)
+    if hits is None:
+        if mode == "vector":
+            hits = vector_search(query, n_results, db_path, embedding)
+        elif mode == "lexical":
+            hits = get_store(db_path).lexical.search(query, n_results)
+        else:
+            candidates = max(n_results * 4, 20)
+            hits = reciprocal_rank_fusion(
+                [
+                    vector_search(query, candidates, db_path, embedding),
+                    get_store(db_path).lexical.search(query, candidates),
+                ],
+                n_results,
+            )
+        result_cache.put(key, hits)
+    return hits
+
+
+def format_context(hits):
+    return "\n\n".join(f"Source: {hit['url']}\n{hit['text']}" for hit in hits)
+
+
+def search_hits(query, n_results=5, db_path="./chroma_db", mode="vector", rerank=False, token_budget=600,
+                candidates=30):
+    """Like search, but returns the selected hit dicts instead of the formatted context."""
+    with metrics.span("search", mode=mode, rerank=rerank):
+        if rerank:
+            from .rerank import rerank as rerank_hits
+            hits, info = rerank_hits(query, retrieve(query, candidates, mode, db_path), token_budget, n_results)
+            print(f"Rerank: {info['latency_ms']:.0f} ms, {info['baseline_tokens']} -> "
+                  f"{info['context_tokens']} context tokens ({info['tokens_saved']} saved)")
+        else:
+            hits = retrieve(query, n_results, mode, db_path)
+    for hit in hits:
+        print(f"\nURL: {hit['url']}")
+        print(f"Text: {hit['text'][:200]}...\n")
+    return hits
+
+
+def search(query, n_results=5, db_path="./chroma_db", mode="vector", rerank=False, token_budget=600,
+           candidates=30):
+    """Retrieve context for a query and format it for the LLM prompt.
+
+    With rerank=True, `candidates` hits are over-fetched, rescored with a
+    cross-encoder and packed into token_budget tokens, one chunk per URL,
+    instead of returning the raw top n_results.
+    """
+    return format_context(search_hits(query, n_results, db_path, mode, rerank, token_budget, candidates))
+
+
+def cache_stats():
+    """Hit/miss counters for the query embedding and search result caches."""
+    return {'embeddings': embedding_cache.stats(), 'results': result_cache.stats()}
 
-    return "\n\n".join(context_parts)
 
 if __name__ == "__main__":
     import sys
-    query = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else "undergraduate courses"
-    search(query)
+    args = sys.argv[1:]
+    mode = "vector"
+    if args and args[0].startswith("--mode="):
+        mode = args.pop(0).split("=", 1)[1]
+    query = " ".join(args) if args else "undergraduate courses"
+    search(query, mode=mode)
@@ -0,0 +1,119 @@
+import threading
+import time
+
+from utils import metrics
+from utils.chunker import get_token_counter
+
+DEFAULT_RERANKER = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class Reranker:
+    """Small CPU cross-encoder that scores (query, passage) pairs, loaded on first use."""
+
+    def __init__(self, model_name=DEFAULT_RERANKER, device="cpu", batch_size=32):
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+                    self._model = CrossEncoder(self.model_name, device=self.device)
+        return self._model
+
+    def score(self, query, hits):
+        if not hits:
+            return []
+        pairs = [(query, hit['text']) for hit in hits]
+        return [float(s) for s in self.model.predict(pairs, batch_size=self.batch_size)]
+
+
+def pack_context(hits, token_counts, token_budget, max_per_url=1):
+    """Pick hits best-first until the token budget is full, at most max_per_url per URL.
+
+    A hit that doesn't fit is skipped so a shorter, lower-ranked one can still
+    use the remaining budget.
+    """
+    selected = []
+    used = 0
+    per_url = {}
+    for hit, tokens in zip(hits, token_counts):
+        if per_url.get(hit['url'], 0) >= max_per_url:
+            continue
+        if used + tokens > token_budget:
+            continue
+        selected.append(hit)
+        used += tokens
+        per_url[hit['url']] = per_url.get(hit['url'], 0) + 1
+    return selected, used
+
+
+class RerankStats:
+    """Running totals of rerank latency and prompt tokens saved."""
+
+    def __init__(self):
+        self.calls = 0
+        self.latency_ms = 0.0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.lock = threading.Lock()
+
+    def record(self, latency_ms, tokens_in, tokens_out):
+        with self.lock:
+            self.calls += 1
+            self.latency_ms += latency_ms
+            self.tokens_in += tokens_in
+            self.tokens_out += tokens_out
+
+    def stats(self):
+        return {
+            'calls': self.calls,
+            'avg_latency_ms': self.latency_ms / self.calls if self.calls else 0.0,
+            'tokens_saved': self.tokens_in - self.tokens_out,
+            'avg_tokens_saved': (self.tokens_in - self.tokens_out) / self.calls if self.calls else 0.0,
+        }
+
+
+_reranker = None
+rerank_stats = RerankStats()
+
+
+def get_reranker():
+    global _reranker
+    if _reranker is None:
+        _reranker = Reranker()
+    return _reranker
+
+
+def rerank(query, candidates, token_budget=600, n_baseline=5, max_per_url=1, reranker=None):
+    """Rescore over-fetched candidates with the cross-encoder and pack the best into token_budget.
+
+    Returns (hits, info). info has the rerank latency, the tokens the plain
+    top-n_baseline context would have used, the packed context's tokens and
+    the difference saved.
+    """
+    start = time.perf_counter()
+    reranker = reranker or get_reranker()
+    scores = reranker.score(query, candidates)
+    ranked = [dict(hit, score=score) for score, hit in
+              sorted(zip(scores, candidates), key=lambda pair: pair[0], reverse=True)]
+    count_tokens = get_token_counter()
+    token_counts = count_tokens([hit['text'] for hit in ranked])
+    selected, used = pack_context(ranked, token_counts, token_budget, max_per_url)
+    latency_ms = (time.perf_counter() - start) * 1000
+
+    baseline = sum(count_tokens([hit['text'] for hit in candidates[:n_baseline]]))
+    rerank_stats.record(latency_ms, baseline, used)
+    metrics.observe("rerank_seconds", latency_ms / 1000)
+    metrics.inc("rerank_tokens_saved_total", baseline - used)
+    return selected, {
+        'latency_ms': latency_ms,
+        'baseline_tokens': baseline,
+        'context_tokens': used,
+        'tokens_saved': baseline - used,
+    }
@@ -0,0 +1,149 @@
+import os
+import threading
+
+from .cache import collection_version
+from .chroma_client import get_embedding_function
+from .index_config import IndexConfig, PCAProjection
+from .lexical import LexicalIndex
+
+COLLECTION_NAME = "university_docs"
+
+
+class VectorStore:
+    """Process-wide handle on the Chroma client, the university_docs collection
+    and the BM25 lexical index stored alongside it.
+
+    The client and collection are opened once on first use and then reused,
+    so repeated searches don't pay setup cost. chromadb itself is only
+    imported when the client is first needed. HNSW settings and the optional
+    PCA projection come from the IndexConfig saved in db_path.
+
+    The collection handle is reopened (and the IndexConfig and projection
+    reloaded) whenever the collection version changes, so a rebuild by
+    another process is picked up without a restart.
+    """
+
+    def __init__(self, db_path="./chroma_db", collection_name=COLLECTION_NAME):
+        self.db_path = db_path
+        self.collection_name = collection_name
+        self._client = None
+        self._collection = None
+        self._version = None
+        self._lexical = None
+        self._lock = threading.Lock()
+        self.index_config = IndexConfig.load(db_path)
+        self.projection = PCAProjection.load(db_path) if self.index_config.pca_dims else None
+
+    @property
+    def embedding_fn(self):
+        if self.projection is not None:
+            from .embedding_functions import ProjectedEmbeddingFunction
+            return ProjectedEmbeddingFunction(get_embedding_function(), self.projection)
+        return get_embedding_function()
+
+    def transform(self, embedding):
+        """Map a full-size query embedding into the collection's vector space."""
+        if self.projection is None:
+            return embedding
+        return self.projection(embedding).tolist()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import chromadb
+                    self._client = chromadb.PersistentClient(path=self.db_path)
+        return self._client
+
+    @property
+    def collection(self):
+        version = collection_version(self.db_path)
+        if self._collection is None or version != self._version:
+            client = self.client
+            with self._lock:
+                if self._collection is None or version != self._version:
+                    if self._version is not None and version != self._version:
+                        self._reload_config()
+                    self._collection = client.get_or_create_collection(
+                        self.collection_name, embedding_function=self.embedding_fn,
+                        configuration=self.index_config.hnsw()
+                    )
+                    self._version = version
+        return self._collection
+
+    def _reload_config(self):
+        self.index_config = IndexConfig.load(self.db_path)
+        self.projection = PCAProjection.load(self.db_path) if self.index_config.pca_dims else None
+
+    def refresh(self):
+        """Forget the collection handle so the next access reopens it."""
+        with self._lock:
+            self._collection = None
+            self._version = None
+            self._reload_config()
+
+    def query(self, embedding, n_results):
+        """Nearest neighbours of a full-size query embedding, as Chroma query results.
+
+        Retries once with a fresh handle if the collection was dropped and
+        recreated behind this one (e.g. a rebuild still in progress elsewhere).
+        """
+        from chromadb.errors import NotFoundError
+        try:
+            collection = self.collection
+            return collection.query(query_embeddings=[self.transform(embedding)], n_results=n_results)
+        except NotFoundError:
+            self.refresh()
+            return self.collection.query(query_embeddings=[self.transform(embedding)], n_results=n_results)
+
+    def set_index_config(self, config):
+        """Save a new IndexConfig; space, M and ef_construction apply once the collection is rebuilt."""
+        config.save(self.db_path)
+        self.index_config = config
+        if not config.pca_dims:
+            self.projection = None
+        if self._collection is not None:
+            self._collection.modify(configuration={"hnsw": {
+                "ef_search": config.ef_search,
+                "batch_size": config.batch_size,
+                "sync_threshold": config.sync_threshold,
+            }})
+
+    def fit_pca(self, texts):
+        """Fit the PCA projection on full-size embeddings of texts and save it; returns the variance kept."""
+        embeddings = get_embedding_function()(texts)
+        self.projection = PCAProjection.fit(embeddings, self.index_config.pca_dims)
+        self.projection.save(self.db_path)
+        self._collection = None
+        return self.projection.explained_variance(embeddings)
+
+    @property
+    def lexical(self):
+        if self._lexical is None:
+            with self._lock:
+                if self._lexical is None:
+                    os.makedirs(self.db_path, exist_ok=True)
+                    self._lexical = LexicalIndex(os.path.join(self.db_path, "lexical.db"))
+        return self._lexical
+
+    def delete_collection(self):
+        """Drop the collection; the next access to .collection recreates it empty."""
+        try:
+            self.client.delete_collection(self.collection_name)
+            print(" Wiped existing collection")
+        except Exception:
+            pass
+        self._collection = None
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(db_path="./chroma_db"):
+    """Return the shared VectorStore for db_path, creating it on first use."""
+    with _stores_lock:
+        if db_path not in _stores:
+            _stores[db_path] = VectorStore(db_path)
+        return _stores[db_path]
@@ -1,5 +1,11 @@
 """Web scraping modules."""
 
-from .scraper import WebScraper, main
+from .scraper import WebScraper, main, rechunk
+from .crawl_cache import CrawlCache
+from .extractors import EXTRACTORS, get_extractor
+from .frontier import Frontier, HostRateLimiter, normalize_url
 
-__all__ = ['WebScraper', 'main']
+__all__ = [
+    'WebScraper', 'main', 'rechunk', 'CrawlCache', 'EXTRACTORS', 'get_extractor', 'Frontier', 'HostRateLimiter',
+    'normalize_url',
+]
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+# Statuses that mean a page has been taken down rather than failed to load
+GONE_STATUSES = (404, 410)
+
+
+class CrawlCache:
+    """Persistent per-URL crawl cache for incremental re-crawls.
+
+    Stores the ETag, Last-Modified and content hash of every fetched page
+    alongside its extracted page data and links, so unchanged pages can be
+    answered from disk instead of being downloaded and parsed again.
+    """
+
+    def __init__(self, path="crawl_cache.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                page TEXT,
+                links TEXT,
+                fetched_at REAL
+            )"""
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(pages)")}
+        if 'fetched_at' not in columns:
+            # Caches written before sitemap lastmod support
+            self.conn.execute("ALTER TABLE pages ADD COLUMN fetched_at REAL")
+        self.conn.commit()
+        self.previous_urls = {row[0] for row in self.conn.execute("SELECT url FROM pages")}
+        self.seen = set()
+        self.gone = set()
+        self.added = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.failed = 0
+        self._validators = {}
+
+    @staticmethod
+    def hash_content(content):
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get(self, url):
+        """Return the cached entry for a URL, or None."""
+        row = self.conn.execute(
+            "SELECT etag, last_modified, content_hash, page, links FROM pages WHERE url = ?",
+            (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'content_hash': row[2],
+            'page': json.loads(row[3]) if row[3] else None,
+            'links': json.loads(row[4]) if row[4] else [],
+        }
+
+    def conditional_headers(self, url):
+        """Build If-None-Match / If-Modified-Since headers for a cached URL."""
+        entry = self.get(url)
+        headers = {}
+        if entry and entry['page'] is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def check_response(self, url, etag, last_modified, content):
+        """Record validators for a fresh 200 response.
+
+        Returns True if the body is identical to the cached copy, in which case
+        the entry is refreshed and the page should be treated as unchanged.
+        """
+        content_hash = self.hash_content(content)
+        entry = self.get(url)
+        if entry and entry['page'] is not None and entry['content_hash'] == content_hash:
+            self.conn.execute(
+                "UPDATE pages SET etag = ?, last_modified = ? WHERE url = ?",
+                (etag, last_modified, url)
+            )
+            self.mark_unchanged(url)
+            return True
+        self._validators[url] = (etag, last_modified, content_hash)
+        return False
+
+    def mark_unchanged(self, url, verified=True):
+        """Count a cached page as current; verified=True records that the server just confirmed it."""
+        if verified:
+            self.conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+        self.seen.add(url)
+        self.unchanged += 1
+
+    def mark_failed(self, url, status=None):
+        """Record a failed fetch; returns True if the cached page should be served instead.
+
+        A 404 or 410 marks the page as removed. Any other failure (timeout,
+        connection error, 5xx, rate limiting) is treated as transient: a
+        cached page is kept and counted as seen.
+        """
+        if status in GONE_STATUSES:
+            self.gone.add(url)
+            return False
+        entry = self.get(url)
+        if entry is None or entry['page'] is None:
+            return False
+        self.seen.add(url)
+        self.failed += 1
+        return True
+
+    def fetch_times(self):
+        """URL -> time the cached copy was last fetched or confirmed unchanged, for pages with data."""
+        return dict(self.conn.execute(
+            "SELECT url, fetched_at FROM pages WHERE page IS NOT NULL AND fetched_at IS NOT NULL"
+        ))
+
+    def iter_pages(self):
+        """Cached page records, in the order they were last stored."""
+        for (page,) in self.conn.execute("SELECT page FROM pages WHERE page IS NOT NULL ORDER BY rowid"):
+            yield json.loads(page)
+
+    def store(self, url, page_data, links):
+        """Persist extracted page data and links for a freshly parsed page."""
+        etag, last_modified, content_hash = self._validators.pop(url, (None, None, None))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_hash, page, links, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, content_hash,
+             json.dumps(page_data, ensure_ascii=False), json.dumps(links), time.time())
+        )
+        self.seen.add(url)
+        if url in self.previous_urls:
+            self.changed += 1
+        else:
+            self.added += 1
+
+    def commit(self):
+        self.conn.commit()
+
+    def removed_urls(self):
+        """URLs cached by a previous crawl that now answer 404 or 410."""
+        return (self.gone & self.previous_urls) - self.seen
+
+    def prune(self):
+        """Drop entries for pages that have disappeared from the site."""
+        removed = self.removed_urls()
+        self.conn.executemany("DELETE FROM pages WHERE url = ?", ((url,) for url in removed))
+        self.conn.commit()
+        return len(removed)
+
+    def report(self):
+        return {
+            'added': self.added,
+            'changed': self.changed,
+            'unchanged': self.unchanged,
+            'failed': self.failed,
+            'removed': len(self.removed_urls()),
+        }
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,229 @@
+"""HTML extractors: raw HTML -> (page_data, links).
+
+Every extractor is a module-level function extract(url, html_content)
+returning the same page_data dict ('url', 'title', 'text', 'headings') and
+list of absolute link URLs, so they are interchangeable and can run in a
+parser process pool.
+
+    bs4         the reference BeautifulSoup implementation (several tree walks)
+    lxml        one pass over an lxml tree, built by the same libxml2
+                parser bs4 uses here
+    selectolax  one pass over a Lexbor (HTML5) tree; fastest, but on
+                malformed markup the HTML5 tree can differ slightly from
+                libxml2's. Needs the optional 'selectolax' package.
+
+benchmarks/bench_extract.py checks parity and measures pages/sec.
+"""
+import os
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+# Elements whose text starts on a new line in page_data['text']
+BLOCK_TAGS = [
+    'p', 'div', 'li', 'ul', 'ol', 'dl', 'dt', 'dd', 'table', 'tr', 'td', 'th',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section', 'article', 'header', 'footer',
+    'nav', 'main', 'aside', 'blockquote', 'pre', 'form', 'figcaption', 'br',
+]
+HEADING_TAGS = ('h1', 'h2', 'h3')
+# Removed with their content before extraction
+REMOVED_TAGS = ('script', 'style')
+# bs4 keeps text under these in special string classes that get_text() leaves out
+HIDDEN_TEXT_TAGS = ('template', 'rt', 'rp')
+
+_BLOCK = frozenset(BLOCK_TAGS)
+_HEADINGS = frozenset(HEADING_TAGS)
+_REMOVED = frozenset(REMOVED_TAGS)
+_HIDDEN = frozenset(HIDDEN_TEXT_TAGS)
+
+
+def block_text(soup):
+    """Page text with one line per block element and whitespace collapsed within lines.
+
+    Keeps the paragraph/heading structure the chunker splits on, which a flat
+    get_text(separator=' ') throws away.
+    """
+    for tag in soup.find_all(BLOCK_TAGS):
+        tag.insert_before('\n')
+        tag.append('\n')
+    return _join_lines(soup.get_text(separator=' '))
+
+
+def _join_lines(text):
+    lines = (' '.join(line.split()) for line in text.split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def extract_page(url, html_content):
+    """Parse raw HTML into page data and the absolute URLs it links to (BeautifulSoup).
+
+    Module-level and free of scraper state so it can run in a parser
+    process pool.
+    """
+    soup = BeautifulSoup(html_content, 'lxml')
+
+    # Remove scripts/styles
+    for script in soup(REMOVED_TAGS):
+        script.decompose()
+
+    # Extract page data
+    title = soup.find('title')
+    headings = [' '.join(h.get_text(separator=' ').split()) for h in soup.find_all(HEADING_TAGS)]
+    links = [urljoin(url, link['href']) for link in soup.find_all('a', href=True)]
+    page_data = {
+        'url': url,
+        'title': title.get_text() if title else '',
+        'text': block_text(soup),
+        'headings': headings
+    }
+    return page_data, links
+
+
+class _PageBuilder:
+    """Accumulates page_data and links from a document-order walk of start/text/end events.
+
+    Reproduces extract_page's output: text pieces joined with spaces, a line
+    break before and at the end of every block element, headings in start
+    order, the first <title>'s text, and every <a href>.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.parts = []
+        self.headings = []
+        self.open_headings = []
+        self.links = []
+        self.title = None
+        self.title_parts = None
+        self.hidden = 0
+
+    def start(self, tag, href):
+        if tag in _BLOCK:
+            self.parts.append('\n')
+        if tag in _HEADINGS:
+            self.open_headings.append((len(self.headings), []))
+            self.headings.append(None)
+        elif tag == 'title' and self.title is None and self.title_parts is None:
+            self.title_parts = []
+        if href is not None and tag == 'a':
+            self.links.append(urljoin(self.url, href))
+        if tag in _HIDDEN:
+            self.hidden += 1
+
+    def text(self, text):
+        if not text or self.hidden:
+            return
+        self.parts.append(text)
+        for _, parts in self.open_headings:
+            parts.append(text)
+        if self.title_parts is not None:
+            self.title_parts.append(text)
+
+    def end(self, tag):
+        if tag in _BLOCK:
+            self.parts.append('\n')
+        if tag in _HEADINGS and self.open_headings:
+            index, parts = self.open_headings.pop()
+            self.headings[index] = ' '.join(' '.join(parts).split())
+        elif tag == 'title' and self.title_parts is not None and self.title is None:
+            self.title = ''.join(self.title_parts)
+            self.title_parts = None
+        if tag in _HIDDEN:
+            self.hidden -= 1
+
+    def result(self):
+        page_data = {
+            'url': self.url,
+            'title': self.title or '',
+            'text': _join_lines(' '.join(self.parts)),
+            'headings': self.headings,
+        }
+        return page_data, self.links
+
+
+def extract_page_lxml(url, html_content):
+    """extract_page in a single pass over an lxml tree."""
+    import lxml.html
+    from lxml import etree
+
+    page = _PageBuilder(url)
+    try:
+        root = lxml.html.document_fromstring(html_content)
+    except ValueError:
+        # str input with an XML encoding declaration (XHTML)
+        root = lxml.html.document_fromstring(html_content.encode('utf-8'),
+                                             parser=lxml.html.HTMLParser(encoding='utf-8'))
+    except etree.ParserError:
+        # Empty document
+        return page.result()
+
+    walker = etree.iterwalk(root, events=('start', 'end', 'comment', 'pi'))
+    for event, element in walker:
+        if event in ('comment', 'pi'):
+            # Only the tail of a comment or processing instruction is text
+            page.text(element.tail)
+            continue
+        tag = element.tag
+        if event == 'start':
+            if tag in _REMOVED:
+                walker.skip_subtree()
+                continue
+            page.start(tag, element.get('href'))
+            page.text(element.text)
+        else:
+            if tag not in _REMOVED:
+                page.end(tag)
+            page.text(element.tail)
+    return page.result()
+
+
+def extract_page_selectolax(url, html_content):
+    """extract_page in a single pass over a selectolax (Lexbor) tree."""
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+    except ImportError:
+        raise ImportError("The selectolax extractor requires the 'selectolax' package")
+
+    page = _PageBuilder(url)
+    root = LexborHTMLParser(html_content).root
+    node = root
+    while node is not None:
+        descend = False
+        if node.is_text_node:
+            page.text(node.text_content)
+        elif node.is_element_node and node.tag not in _REMOVED:
+            attributes = node.attributes
+            page.start(node.tag, (attributes['href'] or '') if 'href' in attributes else None)
+            descend = True
+
+        if descend and node.child is not None:
+            node = node.child
+            continue
+        # Close this node and every ancestor whose last child it is
+        while True:
+            if node.is_element_node and node.tag not in _REMOVED:
+                page.end(node.tag)
+            if node.mem_id == root.mem_id:
+                node = None
+                break
+            if node.next is not None:
+                node = node.next
+                break
+            node = node.parent
+    return page.result()
+
+
+EXTRACTORS = {
+    'bs4': extract_page,
+    'lxml': extract_page_lxml,
+    'selectolax': extract_page_selectolax,
+}
+
+
+def get_extractor(name=None):
+    """Extractor function by name; name=None uses STIRBOT_EXTRACTOR or 'lxml'."""
+    name = name or os.environ.get("STIRBOT_EXTRACTOR", "lxml")
+    try:
+        return EXTRACTORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown extractor: {name} (expected one of {sorted(EXTRACTORS)})")
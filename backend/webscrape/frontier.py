@@ -0,0 +1,169 @@
+import asyncio
+import sqlite3
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from urllib.robotparser import RobotFileParser
+
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'dclid', 'mc_cid', 'mc_eid', '_ga', '_gl', 'ref'}
+
+
+def normalize_url(url):
+    """Dedup key for a URL, so the same page is only queued once.
+
+    Lowercases scheme and host, drops the fragment and tracking query params
+    (utm_*, gclid, ...), sorts the remaining params and gives extension-less
+    paths a trailing slash, which is how stir.ac.uk serves its pages. Only
+    used to compare URLs; the URL as linked is what gets fetched.
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path or '/'
+    last_segment = path.rsplit('/', 1)[-1]
+    if last_segment and '.' not in last_segment:
+        path += '/'
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+class Frontier:
+    """FIFO crawl frontier backed by a deque and persisted to SQLite.
+
+    Every queued URL is written to disk as pending and marked done once it
+    has been processed, so an interrupted crawl resumes with the same seen
+    set and remaining queue. path=None keeps the frontier in memory.
+
+    URLs are queued and stored as given; the seen set holds their
+    normalize_url keys, so variants of a queued URL are not added again.
+    """
+
+    def __init__(self, path="crawl_frontier.db"):
+        self.conn = sqlite3.connect(path or ":memory:")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS frontier (seq INTEGER PRIMARY KEY, url TEXT UNIQUE, done INTEGER)"
+        )
+        self.conn.commit()
+        self.seen = set()
+        self.queue = deque()
+        for url, done in self.conn.execute("SELECT url, done FROM frontier ORDER BY seq"):
+            self.seen.add(normalize_url(url))
+            if not done:
+                self.queue.append(url)
+        # A previous crawl that ran to completion leaves nothing pending
+        self.resumed = bool(self.queue)
+        if not self.resumed:
+            self.clear()
+
+    def add(self, url):
+        """Queue a URL if its normalized form has not been seen. Returns True if added."""
+        key = normalize_url(url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        self.queue.append(url)
+        self.conn.execute("INSERT OR IGNORE INTO frontier (url, done) VALUES (?, 0)", (url,))
+        return True
+
+    def add_many(self, urls):
+        """Queue many URLs in one transaction, in order. Returns how many were new."""
+        added = []
+        for url in urls:
+            key = normalize_url(url)
+            if key not in self.seen:
+                self.seen.add(key)
+                self.queue.append(url)
+                added.append((url,))
+        self.conn.executemany("INSERT OR IGNORE INTO frontier (url, done) VALUES (?, 0)", added)
+        return len(added)
+
+    def pop(self):
+        return self.queue.popleft()
+
+    def mark_done(self, url):
+        self.conn.execute("UPDATE frontier SET done = 1 WHERE url = ?", (url,))
+
+    def done_urls(self):
+        return {row[0] for row in self.conn.execute("SELECT url FROM frontier WHERE done = 1")}
+
+    def commit(self):
+        self.conn.commit()
+
+    def clear(self):
+        self.conn.execute("DELETE FROM frontier")
+        self.conn.commit()
+        self.seen.clear()
+        self.queue.clear()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __contains__(self, url):
+        return normalize_url(url) in self.seen
+
+    def __len__(self):
+        return len(self.queue)
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second with bursts up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """Per-host token buckets plus a global cap on in-flight fetches."""
+
+    def __init__(self, max_concurrent=10, rate=5.0, burst=5):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+
+    def set_crawl_delay(self, host, delay):
+        """Honour a robots.txt Crawl-delay: one request per `delay` seconds."""
+        self.buckets[host] = TokenBucket(1.0 / delay, 1)
+
+    @asynccontextmanager
+    async def limit(self, url):
+        host = urlsplit(url).netloc
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        await bucket.acquire()
+        async with self.semaphore:
+            yield
+
+
+async def fetch_robots(client, base_url):
+    """Fetch and parse robots.txt for a site. Returns None if it can't be read."""
+    robots_url = urlunsplit(urlsplit(base_url)[:2] + ('/robots.txt', '', ''))
+    try:
+        response = await client.get(robots_url)
+        if response.status_code != 200:
+            return None
+    except Exception as e:
+        print(f"Could not fetch {robots_url}: {e}")
+        return None
+    robots = RobotFileParser(robots_url)
+    robots.parse(response.text.splitlines())
+    return robots
@@ -1,29 +1,175 @@
 import httpx
 import asyncio
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urldefrag, urlsplit
+import os
 import time
-import json
 
-from utils.chunker import chunk_scraped_data
+from utils import metrics
+from utils.chunker import chunk_scraped_data, iter_token_chunks
+from utils.records import RecordWriter, iter_records
+from utils.dedup import Deduplicator
+from .crawl_cache import CrawlCache
+from .extractors import get_extractor
+from .frontier import Frontier, HostRateLimiter, fetch_robots, normalize_url
+from .sitemap import fetch_sitemap_urls, prioritize
+
+SITE = "https://www.stir.ac.uk"
+
+# Responses with any other Content-Type are dropped before the body is read
+HTML_TYPES = ('text/html', 'application/xhtml+xml')
+# Pages larger than this (decoded) are abandoned mid-download
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+# Links to these never enter the frontier
+SKIP_EXTENSIONS = frozenset({
+    'pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx', 'odt', 'ods', 'rtf', 'csv',
+    'jpg', 'jpeg', 'png', 'gif', 'svg', 'webp', 'bmp', 'ico', 'tif', 'tiff',
+    'mp3', 'mp4', 'm4a', 'mov', 'avi', 'wmv', 'webm', 'wav',
+    'zip', 'gz', 'tar', 'rar', '7z', 'exe', 'dmg', 'msi',
+    'ics', 'vcf', 'xml', 'rss', 'atom', 'json', 'js', 'css', 'woff', 'woff2', 'ttf', 'eot',
+})
+
+# Returned by fetch_page when the crawl cache says the page has not changed
+UNCHANGED = object()
+
+
+def skipped_extension(url):
+    """The file extension of url if it is one we never crawl, else None."""
+    last_segment = urlsplit(url).path.rsplit('/', 1)[-1]
+    if '.' not in last_segment:
+        return None
+    extension = last_segment.rsplit('.', 1)[-1].lower()
+    return extension if extension in SKIP_EXTENSIONS else None
+
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
 
 
 class WebScraper:
-    def __init__(self, timeout=30.0):
-        self.client = httpx.AsyncClient(timeout=timeout, follow_redirects=True)
+    """Async fetcher for one site.
+
+    The connection pool is sized to max_connections (the crawl concurrency)
+    and keeps those connections alive between requests. HTTP/2 is used when
+    the h2 package is installed, multiplexing requests over one connection.
+    httpx advertises gzip/deflate, plus br and zstd when brotli/zstandard
+    are installed, and decodes responses transparently.
+
+    URLs in `fresh` (set from sitemap lastmod) are known to be unchanged
+    since they were cached and are served from the crawl cache unfetched.
+
+    Responses are streamed: non-HTML Content-Types and bodies over max_bytes
+    are abandoned without being downloaded in full. `skipped` counts the
+    distinct URLs dropped this way, or by filter_links, by reason.
+
+    `extract` is the HTML extractor (see webscrape.extractors) process_url
+    parses pages with.
+    """
+
+    def __init__(self, timeout=30.0, cache=None, max_connections=10, http2=True, site=SITE,
+                 max_bytes=MAX_PAGE_BYTES, extractor=None):
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            follow_redirects=True,
+            http2=http2 and _http2_available(),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=30.0,
+            ),
+        )
+        self.cache = cache
+        self.site = site
+        self.fresh = set()
+        self.max_bytes = max_bytes
+        self.extract = get_extractor(extractor)
+        self.skipped = Counter()
+        self._skipped_urls = set()
+
+    def skip(self, url, reason):
+        """Count url as skipped for reason (once per URL)."""
+        if url in self._skipped_urls:
+            return
+        self._skipped_urls.add(url)
+        self.skipped[reason] += 1
+        metrics.inc("scrape_skipped_total", reason=reason)
+        print(f"Skipping {url}: {reason}")
+
+    def new_links(self, links, found_urls, excluded_patterns):
+        """filter_links for this scraper's site, counting skipped links."""
+        return filter_links(links, found_urls, excluded_patterns, self.site, self.skip)
 
     async def fetch_page(self, url):
-        """Fetch HTML content from a URL."""
+        """Fetch HTML content from a URL.
+
+        With a crawl cache attached, sends a conditional request and returns
+        UNCHANGED for 304 responses or bodies identical to the cached copy,
+        and for transient failures of pages the cache holds (see
+        CrawlCache.mark_failed). Returns None for other failures and for
+        non-HTML or oversized responses.
+        """
         try:
-            response = await self.client.get(url)
-            response.raise_for_status()
-            return response.text
+            headers = self.cache.conditional_headers(url) if self.cache else None
+            with metrics.span("scrape_fetch"):
+                async with self.client.stream("GET", url, headers=headers) as response:
+                    metrics.inc("scrape_responses_total", status=response.status_code)
+                    if self.cache and response.status_code == 304:
+                        self.cache.mark_unchanged(url)
+                        metrics.inc("scrape_unchanged_total")
+                        return UNCHANGED
+                    response.raise_for_status()
+                    content = await self._read_html(url, response)
+            if content is None:
+                return None
+            if self.cache and self.cache.check_response(
+                url,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified'),
+                content,
+            ):
+                metrics.inc("scrape_unchanged_total")
+                return UNCHANGED
+            return content
         except httpx.HTTPError as e:
+            metrics.inc("scrape_failures_total", error=type(e).__name__)
             print(f"HTTP error occurred: {e}")
-            return None
+            status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+            return self._fetch_failed(url, status)
         except Exception as e:
+            metrics.inc("scrape_failures_total", error=type(e).__name__)
             print(f"An error occurred: {e}")
+            return self._fetch_failed(url)
+
+    def _fetch_failed(self, url, status=None):
+        if self.cache and self.cache.mark_failed(url, status):
+            print(f"Keeping the cached copy of {url}")
+            return UNCHANGED
+        return None
+
+    async def _read_html(self, url, response):
+        """Body of a streamed response as text, or None if it isn't HTML or exceeds max_bytes."""
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type and content_type not in HTML_TYPES:
+            self.skip(url, 'content_type')
+            return None
+        length = response.headers.get('Content-Length', '')
+        if length.isdigit() and int(length) > self.max_bytes:
+            self.skip(url, 'too_large')
             return None
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if len(body) > self.max_bytes:
+                self.skip(url, 'too_large')
+                return None
+        metrics.inc("scrape_bytes_total", len(body))
+        return body.decode(response.encoding or 'utf-8', errors='replace')
 
     def parse_html(self, html_content):
         """Parse HTML content using BeautifulSoup."""
@@ -34,6 +180,8 @@ class WebScraper:
     async def scrape(self, url):
         """Main scraping method: fetch and parse a URL."""
         html_content = await self.fetch_page(url)
+        if html_content is UNCHANGED:
+            return UNCHANGED
         return self.parse_html(html_content)
 
     async def close(self):
@@ -47,105 +195,347 @@ class WebScraper:
         await self.close()
 
 
-async def process_url(scraper, url, semaphore, excluded_patterns, found_urls):
-    """Process a single URL with semaphore-based rate limiting."""
-    async with semaphore:
-        soup = await scraper.scrape(url)
-        if soup:
-            # Remove scripts/styles
-            for script in soup(['script', 'style']):
-                script.decompose()
-
-            # Extract page data
-            page_data = {
-                'url': url,
-                'title': soup.find('title').get_text() if soup.find('title') else '',
-                'text': soup.get_text(separator=' ', strip=True),
-                'headings': [h.get_text() for h in soup.find_all(['h1', 'h2', 'h3'])]
-            }
-
-            # Extract links
-            links = soup.find_all('a', href=True)
-            new_urls = []
-            for link in links:
-                absolute_url = urljoin(url, link['href'])
-
-                # Apply same filtering logic
-                if absolute_url in found_urls:
-                    continue
-                if not absolute_url.startswith('https://www.stir.ac.uk'):
-                    continue
-                if any(pattern in absolute_url for pattern in excluded_patterns):
-                    continue
-
-                new_urls.append(absolute_url)
-
-            return page_data, new_urls
-        return None, []
-
-
-async def main(chunk_size=1000, max_concurrent=10):
+def filter_links(links, found_urls, excluded_patterns, site=SITE, on_skip=None):
+    """Keep on-site links that have not been seen and are not excluded, without fragments.
+
+    Links are compared in their normalize_url form (found_urls is a
+    Frontier) but returned as linked. Links to non-HTML files (by
+    extension) are dropped and reported to on_skip(url, 'extension') if
+    given.
+    """
+    new_urls = []
+    for link in links:
+        url = urldefrag(link.strip())[0]
+        key = normalize_url(url)
+        if url in found_urls:
+            continue
+        if not key.startswith(site):
+            continue
+        if any(pattern in key for pattern in excluded_patterns):
+            continue
+        if skipped_extension(key):
+            if on_skip:
+                on_skip(url, 'extension')
+            continue
+        new_urls.append(url)
+    return new_urls
+
+
+class PageChunker:
+    """Page -> chunk records, with optional boilerplate/near-duplicate removal first.
+
+    Pages are cut into chunk_size-character chunks, or, when max_tokens is
+    set, into structure-aware chunks of at most max_tokens embedding-model
+    tokens with chunk_overlap tokens of overlap. Dedup state carries across
+    pages, so feed every page of a crawl through one PageChunker.
+
+    Dedup holds the first pages back until it has boilerplate counts, and
+    token chunking holds pages back to tokenize batch_pages of them in one
+    iter_token_chunks call, so chunks() may return chunks of earlier pages
+    (or none); call flush() after the last page. `holding` is the number of
+    pages whose chunks have not been returned yet.
+    """
+
+    def __init__(self, chunk_size=1000, max_tokens=None, chunk_overlap=32, dedup=True, batch_pages=64):
+        self.chunk_size = chunk_size
+        self.max_tokens = max_tokens
+        self.chunk_overlap = chunk_overlap
+        self.batch_pages = batch_pages
+        self.deduplicator = Deduplicator() if dedup else None
+        self.chunks_written = 0
+        self._pending = []
+
+    def _chunk_pending(self):
+        pages, self._pending = self._pending, []
+        chunks = list(iter_token_chunks(pages, self.max_tokens, self.chunk_overlap, batch_pages=len(pages)))
+        self.chunks_written += len(chunks)
+        return chunks
+
+    def _chunk(self, pages, final=False):
+        if self.max_tokens:
+            self._pending.extend(pages)
+            if self._pending and (final or len(self._pending) >= self.batch_pages):
+                return self._chunk_pending()
+            return []
+        chunks = chunk_scraped_data(pages, chunk_size=self.chunk_size)
+        self.chunks_written += len(chunks)
+        return chunks
+
+    def chunks(self, page):
+        """Chunk records that are ready after adding page."""
+        return self._chunk(self.deduplicator.add(page) if self.deduplicator else [page])
+
+    @property
+    def holding(self):
+        return len(self._pending) + (self.deduplicator.holding if self.deduplicator else 0)
+
+    def flush(self):
+        """Chunk records for the pages still held back."""
+        return self._chunk(self.deduplicator.flush() if self.deduplicator else [], final=True)
+
+    def print_report(self):
+        if not self.deduplicator:
+            return
+        # Pages are only chunked once, after dedup, so the count without it is
+        # estimated from the text removed
+        dedup = self.deduplicator
+        chunks_before = round(self.chunks_written * dedup.chars_in / dedup.chars_out) if dedup.chars_out else 0
+        report = dedup.report(chunks_before, self.chunks_written)
+        print(f"Dedup: {report['pages_collapsed']} near-duplicate pages collapsed, "
+              f"{report['blocks_dropped']} boilerplate blocks dropped "
+              f"({report['text_reduction']:.1%} of text)")
+        print(f"Chunks: ~{report['chunks_before']} -> {report['chunks_after']} "
+              f"({report['chunk_reduction']:.1%} fewer), "
+              f"~{report['index_bytes_saved'] / 1e6:.1f} MB smaller index")
+
+
+def rechunk(pages, output_path="chunked_data.jsonl", chunk_size=1000, max_tokens=None, chunk_overlap=32,
+            dedup=True):
+    """Chunk already-crawled pages without fetching anything.
+
+    pages is a page record file (main's pages_path output) or any iterable
+    of page dicts, e.g. CrawlCache.iter_pages(). Returns the chunk count.
+    """
+    if isinstance(pages, (str, os.PathLike)):
+        pages = iter_records(pages)
+    chunker = PageChunker(chunk_size, max_tokens, chunk_overlap, dedup)
+    page_count = 0
+    with RecordWriter(output_path) as writer:
+        for page in pages:
+            page_count += 1
+            writer.write_many(chunker.chunks(page))
+        writer.write_many(chunker.flush())
+    print(f"Chunked {page_count} pages into {writer.count} chunks in {output_path}")
+    chunker.print_report()
+    return writer.count
+
+
+async def process_url(scraper, url, limiter, excluded_patterns, found_urls, executor=None):
+    """Process a single URL with per-host rate limiting.
+
+    The HostRateLimiter only covers the fetch. Parsing runs inline, or in the
+    given process pool executor so it doesn't block the event loop.
+
+    Returns (page_data, new_urls, changed). Pages the crawl cache reports as
+    unchanged are served from the cache without being parsed, and pages in
+    scraper.fresh without being fetched at all.
+    """
+    with metrics.span("scrape_process_url"):
+        return await _process_url(scraper, url, limiter, excluded_patterns, found_urls, executor)
+
+
+async def _process_url(scraper, url, limiter, excluded_patterns, found_urls, executor):
+    if url in scraper.fresh:
+        entry = scraper.cache.get(url)
+        if entry and entry['page'] is not None:
+            scraper.cache.mark_unchanged(url, verified=False)
+            metrics.inc("scrape_sitemap_skipped_total")
+            return entry['page'], scraper.new_links(entry['links'], found_urls, excluded_patterns), False
+
+    async with limiter.limit(url):
+        html_content = await scraper.fetch_page(url)
+
+    if html_content is UNCHANGED:
+        entry = scraper.cache.get(url)
+        return entry['page'], scraper.new_links(entry['links'], found_urls, excluded_patterns), False
+    if not html_content:
+        return None, [], False
+
+    with metrics.span("scrape_parse"):
+        if executor:
+            loop = asyncio.get_running_loop()
+            page_data, links = await loop.run_in_executor(executor, scraper.extract, url, html_content)
+        else:
+            page_data, links = scraper.extract(url, html_content)
+    metrics.inc("scrape_pages_parsed_total")
+
+    if scraper.cache:
+        scraper.cache.store(url, page_data, links)
+
+    return page_data, scraper.new_links(links, found_urls, excluded_patterns), True
+
+
+def _release(held, frontier, page_writer=None):
+    """Mark held pages done (and save their page records) once their chunks are written."""
+    for url, page_data in held:
+        if page_data and page_writer:
+            page_writer.write(page_data)
+        frontier.mark_done(url)
+    held.clear()
+    frontier.commit()
+
+
+async def main(chunk_size=1000, max_concurrent=10, cache_path="crawl_cache.db", parse_workers=0,
+               output_path="chunked_data.jsonl", pages_path=None, frontier_path="crawl_frontier.db",
+               requests_per_second=5.0, max_tokens=None, chunk_overlap=32, dedup=True, use_sitemap=True,
+               http2=True, site=SITE, max_page_bytes=MAX_PAGE_BYTES, extractor=None):
+    """Crawl the site and stream chunks to output_path as pages complete.
+
+    Output is JSON Lines; a .gz or .zst suffix compresses it. pages_path,
+    if set, additionally streams the raw page records.
+
+    Pages are cut into chunk_size-character chunks, or, when max_tokens is
+    set, into structure-aware chunks of at most max_tokens embedding-model
+    tokens with chunk_overlap tokens of overlap.
+
+    With dedup=True, repeated boilerplate blocks (menus, footers, cookie
+    banners) are stripped and near-duplicate pages dropped before chunking.
+
+    max_concurrent bounds in-flight fetches and requests_per_second is the
+    per-host token-bucket rate, overridden by a robots.txt Crawl-delay.
+    parse_workers > 0 hands HTML parsing to a pool of that many processes
+    instead of the event loop. extractor picks the HTML extractor by name
+    (bs4, lxml, selectolax; default STIRBOT_EXTRACTOR or lxml).
+
+    The frontier is persisted to frontier_path; if a previous crawl was
+    interrupted, it resumes from where it stopped and appends to the output.
+
+    When cache_path is set, the crawl is incremental: pages are fetched with
+    conditional requests and unchanged pages are reused from the crawl cache.
+    Pass cache_path=None for a full crawl.
+
+    With use_sitemap=True the frontier is seeded in bulk from sitemap.xml
+    (or the sitemaps robots.txt lists), following sitemap indexes, most
+    recently modified pages first. Cached pages whose lastmod is older
+    than their last fetch are reused without any request.
+
+    Links to non-HTML files never enter the frontier, and responses that
+    turn out not to be HTML or exceed max_page_bytes are dropped unread.
+    """
     start_time = time.time()
 
     excluded_patterns = [
         '/research/hub',
     ]
+    seeds = [f"{site}/", f"{site}/sitemap/"]
 
-    semaphore = asyncio.Semaphore(max_concurrent)
+    limiter = HostRateLimiter(max_concurrent, rate=requests_per_second, burst=max_concurrent)
     active_tasks = {}
+    # Let parsed-but-unfinished pages queue up without starving the fetchers
+    max_active = max_concurrent + 2 * parse_workers
+    executor = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers else None
 
-    async with WebScraper() as scraper:
-        found_urls = {"https://www.stir.ac.uk/", "https://www.stir.ac.uk/sitemap/"}
-        urls_to_visit = ["https://www.stir.ac.uk/", "https://www.stir.ac.uk/sitemap/"]
-        scraped_data = []
-
-        while urls_to_visit or active_tasks:
-            # Launch new tasks up to limit
-            while urls_to_visit and len(active_tasks) < max_concurrent:
-                url = urls_to_visit.pop(0)
-                print(f"\nLaunching task for: {url}")
-                task = asyncio.create_task(process_url(scraper, url, semaphore, excluded_patterns, found_urls))
-                active_tasks[task] = url
-
-            # Wait for task completion
-            if active_tasks:
-                done, _ = await asyncio.wait(
-                    active_tasks.keys(),
-                    return_when=asyncio.FIRST_COMPLETED
-                )
-
-                # Process results
-                for task in done:
-                    try:
-                        page_data, new_urls = await task
-                        if page_data:
-                            print(f"\nCompleted: {page_data['url']}")
-                            scraped_data.append(page_data)
-
-                        # Add new URLs to queue
-                        for new_url in new_urls:
-                            if new_url not in found_urls:
-                                found_urls.add(new_url)
-                                urls_to_visit.append(new_url)
-                    except Exception as e:
-                        print(f"Error processing task: {e}")
-
-                    del active_tasks[task]
-
-        chunked_data = chunk_scraped_data(scraped_data, chunk_size=chunk_size)
-        """
-        with open("scraped_data.json", "w", encoding="utf-8") as f:
-            json.dump(scraped_data, f, indent=2, ensure_ascii=False)
-        """
-        with open("chunked_data.json", "w", encoding="utf-8") as f:
-            json.dump(chunked_data, f, indent=2, ensure_ascii=False)
+    frontier = Frontier(frontier_path)
+    if frontier.resumed:
+        print(f"Resuming crawl: {len(frontier.seen) - len(frontier)} done, {len(frontier)} queued")
+    else:
+        for seed in seeds:
+            frontier.add(seed)
+
+    cache = CrawlCache(cache_path) if cache_path else None
+    if cache and frontier.resumed:
+        # Pages finished before the interruption still count as present
+        cache.seen.update(frontier.done_urls())
+    changed_pages = 0
+
+    chunker = PageChunker(chunk_size, max_tokens, chunk_overlap, dedup)
+
+    chunk_writer = RecordWriter(output_path, append=frontier.resumed)
+    page_writer = RecordWriter(pages_path, append=frontier.resumed) if pages_path else None
+    pages_visited = 0
+    # (frontier URL, page record) for pages whose chunks the chunker is still
+    # holding back; they are marked done only once their chunks are written
+    held = []
+
+    try:
+        async with WebScraper(cache=cache, max_connections=max_concurrent, http2=http2, site=site,
+                              max_bytes=max_page_bytes, extractor=extractor) as scraper:
+            robots = await fetch_robots(scraper.client, seeds[0])
+            if robots and robots.crawl_delay("*"):
+                limiter.set_crawl_delay(urlsplit(site).netloc, float(robots.crawl_delay("*")))
+
+            if use_sitemap and not frontier.resumed:
+                sitemaps = (robots.site_maps() if robots else None) or [f"{site}/sitemap.xml"]
+                lastmods = await fetch_sitemap_urls(scraper.client, sitemaps)
+                urls = scraper.new_links(prioritize(lastmods), frontier, excluded_patterns)
+                if cache:
+                    fetched = cache.fetch_times()
+                    scraper.fresh = {
+                        url for url in urls
+                        if lastmods.get(url) is not None and url in fetched and lastmods[url] <= fetched[url]
+                    }
+                added = frontier.add_many(urls)
+                frontier.commit()
+                print(f"Sitemap: {len(lastmods)} URLs, {added} queued, "
+                      f"{len(scraper.fresh)} unchanged since last crawl")
+
+            while frontier or active_tasks:
+                # Launch new tasks up to limit
+                while frontier and len(active_tasks) < max_active:
+                    url = frontier.pop()
+                    if robots and not robots.can_fetch("*", url):
+                        frontier.mark_done(url)
+                        continue
+                    print(f"\nLaunching task for: {url}")
+                    task = asyncio.create_task(
+                        process_url(scraper, url, limiter, excluded_patterns, frontier, executor)
+                    )
+                    active_tasks[task] = url
+
+                # Wait for task completion
+                if active_tasks:
+                    done, _ = await asyncio.wait(
+                        active_tasks.keys(),
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+
+                    # Process results
+                    for task in done:
+                        url = active_tasks.pop(task)
+                        page_data = None
+                        try:
+                            page_data, new_urls, changed = await task
+                            if page_data:
+                                if changed:
+                                    print(f"\nCompleted: {page_data['url']}")
+                                    changed_pages += 1
+                                pages_visited += 1
+                                chunk_writer.write_many(chunker.chunks(page_data))
+
+                            # Add new URLs to queue
+                            for new_url in new_urls:
+                                frontier.add(new_url)
+                        except Exception as e:
+                            print(f"Error processing task: {e}")
+
+                        held.append((url, page_data))
+                        if not chunker.holding:
+                            _release(held, frontier, page_writer)
+
+                    if cache:
+                        cache.commit()
+                    frontier.commit()
+
+        chunk_writer.write_many(chunker.flush())
+        _release(held, frontier, page_writer)
+    finally:
+        if executor:
+            executor.shutdown()
+        # Pages still held are not marked done, so a resume crawls them again
+        chunk_writer.close()
+        if page_writer:
+            page_writer.close()
+    # The crawl completed, so the next run starts from the seeds again
+    frontier.clear()
+    frontier.close()
 
     elapsed_time = time.time() - start_time
     print(f"\nScraping complete.")
-    print(f"Total pages visited: {len(scraped_data)}")
+    print(f"Total pages visited: {pages_visited}")
+    print(f"Chunks written to {output_path}: {chunk_writer.count}")
+    print(f"Pages downloaded and parsed: {changed_pages}")
+    if scraper.skipped:
+        print("Skipped: " + ", ".join(f"{count} {reason}" for reason, count in scraper.skipped.most_common()))
+    chunker.print_report()
+    if cache:
+        report = cache.report()
+        cache.prune()
+        cache.close()
+        print(f"Added: {report['added']}  Changed: {report['changed']}  "
+              f"Unchanged: {report['unchanged']}  Removed: {report['removed']}  "
+              f"Kept after failed fetch: {report['failed']}")
     print(f"Time elapsed: {elapsed_time:.2f} seconds")
 
 
 if __name__ == "__main__":
     asyncio.run(main())
-        
@@ -0,0 +1,88 @@
+import asyncio
+import gzip
+import zlib
+from datetime import datetime, timezone
+
+from lxml import etree
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+def parse_lastmod(value):
+    """W3C datetime (2024-05-01, 2024-05-01T10:00:00+00:00, ...Z) as a UTC timestamp, or None."""
+    if not value:
+        return None
+    value = value.strip().replace("Z", "+00:00")
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_sitemap(content):
+    """Parse a sitemap or sitemap index.
+
+    Returns (urls, sitemaps): lists of (loc, lastmod timestamp or None) for
+    pages and for child sitemaps respectively.
+    """
+    if content[:2] == b"\x1f\x8b":
+        content = gzip.decompress(content)
+    root = etree.fromstring(content, parser=etree.XMLParser(recover=True, resolve_entities=False))
+    if root is None:
+        return [], []
+    entries = []
+    for node in root:
+        if not isinstance(node.tag, str):
+            continue
+        loc = node.findtext(f"{SITEMAP_NS}loc") or node.findtext("loc")
+        if loc:
+            lastmod = node.findtext(f"{SITEMAP_NS}lastmod") or node.findtext("lastmod")
+            entries.append((loc.strip(), parse_lastmod(lastmod)))
+    if etree.QName(root).localname == "sitemapindex":
+        return [], entries
+    return entries, []
+
+
+async def fetch_sitemap_urls(client, sitemap_urls, max_depth=3):
+    """Fetch sitemaps, following sitemap indexes up to max_depth levels.
+
+    Child sitemaps at each level are fetched concurrently. Returns a dict of
+    page URL -> lastmod timestamp (None when the sitemap doesn't give one).
+    """
+    pages = {}
+    seen = set()
+    level = list(sitemap_urls)
+    for _ in range(max_depth):
+        level = [url for url in dict.fromkeys(level) if url not in seen]
+        if not level:
+            break
+        seen.update(level)
+        responses = await asyncio.gather(*(client.get(url) for url in level), return_exceptions=True)
+        next_level = []
+        for url, response in zip(level, responses):
+            if isinstance(response, Exception):
+                print(f"Could not fetch sitemap {url}: {response}")
+                continue
+            if response.status_code != 200:
+                print(f"Could not fetch sitemap {url}: HTTP {response.status_code}")
+                continue
+            try:
+                urls, sitemaps = parse_sitemap(response.content)
+            except (OSError, EOFError, zlib.error, etree.XMLSyntaxError) as e:
+                # Empty body, corrupt or truncated .gz, or XML past recovery
+                print(f"Could not parse sitemap {url}: {e}")
+                continue
+            for loc, lastmod in urls:
+                if lastmod is not None or loc not in pages:
+                    pages[loc] = lastmod
+            next_level.extend(loc for loc, _ in sitemaps)
+        level = next_level
+    return pages
+
+
+def prioritize(pages):
+    """Page URLs most recently modified first; pages without a lastmod go last."""
+    return sorted(pages, key=lambda url: -(pages[url] or 0.0))
@@ -1,35 +1,24 @@
 #!/usr/bin/env python3
-"""Simple analytics for chunked_data.json - streaming version for large files"""
+"""Simple analytics for the chunked corpus - streaming version for large files
 
-import ijson
+Parquet corpora (see utils.records) are analysed with vectorized column
+scans instead: python analyse_pages.py ../chunked_data.parquet
+"""
+
+import sys
+from array import array
 from collections import Counter
+from pathlib import Path
 from urllib.parse import urlparse
 import matplotlib.pyplot as plt
+import numpy as np
 
-def main():
-    # Stream data and collect stats
-    urls = set()
-    chunk_count = 0
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.records import iter_records
 
-    print("Streaming through chunked_data.json (this may take a while for large files)...")
-
-    # ============================================================================
-    # AI GENERATED CODE
-    # Model: Claude Opus 4.5 (claude-opus-4-5-20251101)
-    # Prompt: "The file is 20GB and getting killed when loading. Use ijson to
-    #          stream the JSON file instead of loading it all at once."
-    # ============================================================================
-    with open('../chunked_data.json', 'rb') as f:
-        for item in ijson.items(f, 'item'):
-            chunk_count += 1
-            urls.add(item['url'])
-            if chunk_count % 100000 == 0:
-                print(f"  Processed {chunk_count:,} chunks...")
-    # ============================================================================
-
-    print(f"  Done! Processing {len(urls):,} unique URLs...")
-
-    # Count directories
+def directory_counts(urls):
+    """Pages per top-level directory, and per second-level directory within each."""
     directories = Counter()
     subdirectories = {}
 
@@ -46,17 +35,95 @@ def main():
             if top_dir not in subdirectories:
                 subdirectories[top_dir] = Counter()
             subdirectories[top_dir][sub_dir] += 1
+    return directories, subdirectories
+
+
+def stream_stats(path):
+    """Corpus stats from a JSONL/JSON file, one record at a time."""
+    # Stream data and collect stats
+    chunks_per_page = Counter()
+    text_lengths = array('I')
+    chunk_count = 0
+
+    print(f"Streaming through {path} (this may take a while for large files)...")
+
+    # JSONL (optionally .gz/.zst) or a legacy JSON array, one record at a time
+    for item in iter_records(path):
+        chunk_count += 1
+        chunks_per_page[item['url']] += 1
+        text_lengths.append(len(item['text']))
+        if chunk_count % 100000 == 0:
+            print(f"  Processed {chunk_count:,} chunks...")
+
+    print(f"  Done! Processing {len(chunks_per_page):,} unique URLs...")
+    directories, subdirectories = directory_counts(chunks_per_page)
+    return {
+        'chunk_count': chunk_count,
+        'chunks_per_page': np.fromiter(chunks_per_page.values(), dtype=np.int64),
+        'text_lengths': np.frombuffer(text_lengths, dtype=np.uint32),
+        'directories': directories,
+        'subdirectories': subdirectories,
+    }
+
+
+def columnar_stats(path):
+    """Corpus stats from a Parquet corpus as column scans; only url, path_prefix and text are read."""
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    chunk_count = parquet.metadata.num_rows
+    print(f"Scanning columns of {path} ({chunk_count:,} chunks)...")
+
+    pages = pq.read_table(path, columns=['url', 'path_prefix']) \
+        .group_by(['url', 'path_prefix']).aggregate([('url', 'count')])
+    prefixes = pages['path_prefix']
+    top_dirs = pc.struct_field(pc.extract_regex(prefixes, r'^(?P<top>/[^/]*)'), 'top')
+    directories = Counter(dict(zip(*_value_counts(top_dirs))))
+
+    subdirectories = {}
+    nested = pc.match_substring_regex(prefixes, r'^/[^/]+/[^/]+')
+    for sub_dir, count in zip(*_value_counts(pc.filter(prefixes, nested))):
+        top_dir = '/' + sub_dir.split('/')[1]
+        subdirectories.setdefault(top_dir, Counter())[sub_dir] = count
+
+    lengths = [pc.utf8_length(batch.column(0)).to_numpy(zero_copy_only=False)
+               for batch in parquet.iter_batches(columns=['text'])]
+    return {
+        'chunk_count': chunk_count,
+        'chunks_per_page': pages['url_count'].to_numpy(),
+        'text_lengths': np.concatenate(lengths) if lengths else np.array([], dtype=np.int64),
+        'directories': directories,
+        'subdirectories': subdirectories,
+    }
+
+
+def _value_counts(column):
+    counts = column.value_counts()
+    return counts.field('values').to_pylist(), counts.field('counts').to_pylist()
+
+
+def main(path='../chunked_data.jsonl'):
+    stats = columnar_stats(path) if str(path).endswith('.parquet') else stream_stats(path)
+    chunk_count = stats['chunk_count']
+    chunks_per_page = stats['chunks_per_page']
+    text_lengths = stats['text_lengths']
+    directories = stats['directories']
+    subdirectories = stats['subdirectories']
 
     # Print stats
     print(f"\nTotal chunks: {chunk_count:,}")
-    print(f"Unique pages: {len(urls):,}")
-    print(f"Avg chunks/page: {chunk_count / len(urls):.1f}")
+    print(f"Unique pages: {len(chunks_per_page):,}")
+    print(f"Avg chunks/page: {chunk_count / len(chunks_per_page):.1f} "
+          f"(median {np.median(chunks_per_page):.0f}, max {chunks_per_page.max()})")
+    print(f"Chunk length (chars): median {np.median(text_lengths):.0f}, "
+          f"p95 {np.percentile(text_lengths, 95):.0f}, max {text_lengths.max()}")
     print(f"\nTop 10 directories:")
     for dir_path, count in directories.most_common(10):
         print(f"  {dir_path:<25} {count:>5} pages")
 
-    # Create figure with 2 charts
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    # Create figure with 4 charts
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(14, 11))
 
     # Chart 1: Top 10 directories
     top_10 = directories.most_common(10)
@@ -85,9 +152,21 @@ def main():
     ax2.set_xlabel('Number of Pages')
     ax2.set_title('Top Subdirectories (of 3 largest directories)')
 
+    # Chart 3: Chunks per page
+    ax3.hist(chunks_per_page, bins=50, color='steelblue', log=True)
+    ax3.set_xlabel('Chunks per page')
+    ax3.set_ylabel('Pages (log)')
+    ax3.set_title('Chunks per Page')
+
+    # Chart 4: Chunk text lengths
+    ax4.hist(text_lengths, bins=50, color='#2ecc71')
+    ax4.set_xlabel('Characters')
+    ax4.set_ylabel('Chunks')
+    ax4.set_title('Chunk Text Length')
+
     plt.tight_layout()
     plt.savefig('page_analytics.png', dpi=100)
     print(f"\nChart saved to: page_analytics.png")
 
 if __name__ == '__main__':
-    main()
+    main(*sys.argv[1:])